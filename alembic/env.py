@@ -2,17 +2,27 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool, create_engine
 from alembic import context
 from app.database.base import Base
-from app.database.models import post_stat  # noqa: F401
+from app.database.models import post_stat, post_view_rollup, live_entry  # noqa: F401
+from app.database.models.live_entry import FTS_TABLE, TSV_INDEX
 from app.config import settings
 
 config = context.config
 fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
+def include_name(name, type_, parent_names) -> bool:
+    # Full-text search objects come from DDL in the live_entry model
+    if type_ == "table":
+        return not (name or "").startswith(FTS_TABLE)
+    if type_ == "index":
+        return name != TSV_INDEX
+    return True
+
 def run_migrations_offline() -> None:
     context.configure(
         url=settings.database_url_sync,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -28,6 +38,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_name=include_name,
         )
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,40 @@
+"""create post_view_rollups table
+
+Revision ID: 3c1f9a7d2b64
+Revises: 8bbfd67f9803
+Create Date: 2026-10-17 10:12:41.304517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '8bbfd67f9803'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_view_rollups',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('slug', sa.String(length=200), nullable=False),
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug', 'period', 'bucket_start', name='uq_post_view_rollups_bucket')
+    )
+    op.create_index('ix_post_view_rollups_period_bucket', 'post_view_rollups', ['period', 'bucket_start', 'slug', 'views'], unique=False)
+    op.create_index(op.f('ix_post_stats_view_count'), 'post_stats', ['view_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_post_stats_view_count'), table_name='post_stats')
+    op.drop_index('ix_post_view_rollups_period_bucket', table_name='post_view_rollups')
+    op.drop_table('post_view_rollups')
@@ -0,0 +1,35 @@
+"""add live_entries feed index
+
+Revision ID: b7e2d4c1a9f0
+Revises: 3c1f9a7d2b64
+Create Date: 2026-10-17 12:40:18.921734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c1a9f0'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # Rows stamped by CURRENT_TIMESTAMP lack the microseconds SQLAlchemy
+        # binds with; pad them so cursor comparisons see equal strings
+        op.execute(
+            "UPDATE live_entries SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+    op.create_index('ix_live_entries_feed', 'live_entries', ['pinned', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_live_entries_feed', table_name='live_entries')
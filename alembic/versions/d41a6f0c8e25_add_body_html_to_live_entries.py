@@ -0,0 +1,31 @@
+"""add body_html to live_entries
+
+Revision ID: d41a6f0c8e25
+Revises: b7e2d4c1a9f0
+Create Date: 2026-10-17 13:05:52.418806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a6f0c8e25'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c1a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are filled in by `python -m app.backfill`
+    op.add_column('live_entries', sa.Column('body_html', sa.Text(), nullable=True))
+    op.add_column('live_entries', sa.Column('render_version', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('live_entries', 'render_version')
+    op.drop_column('live_entries', 'body_html')
@@ -0,0 +1,46 @@
+"""add live_entries full-text search
+
+Revision ID: f5a3c7e91b08
+Revises: d41a6f0c8e25
+Create Date: 2026-10-17 14:22:07.503611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.models.live_entry import (
+    FTS_TABLE, POSTGRES_FTS_DDL, SQLITE_FTS_DDL, TSV_INDEX,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a3c7e91b08'
+down_revision: Union[str, Sequence[str], None] = 'd41a6f0c8e25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Index the entries that already exist
+        op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for statement in POSTGRES_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif dialect == "postgresql":
+        op.execute(f"DROP INDEX IF EXISTS {TSV_INDEX}")
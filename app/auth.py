@@ -1,5 +1,5 @@
-from fastapi import Request
-from fastapi.responses import RedirectResponse
+import hmac
+from fastapi import HTTPException, Request
 from itsdangerous import TimestampSigner, BadSignature, SignatureExpired
 from app.config import settings
 
@@ -21,7 +21,15 @@ def verify_session(token: str) -> bool:
 def get_session(request: Request) -> str | None:
     return request.cookies.get(SESSION_COOKIE)
 
-async def require_admin(request: Request):
+async def require_admin(request: Request) -> None:
+    """Admit a valid session cookie, or the X-Admin-Token header for scripts.
+
+    Raises, so the route never runs; browsers are sent to the login page.
+    """
+    header = request.headers.get("x-admin-token")
+    if header is not None and hmac.compare_digest(header.encode(), settings.admin_token.encode()):
+        return
     token = get_session(request)
     if not token or not verify_session(token):
-        return RedirectResponse(url="/admin/login", status_code=303)
+        raise HTTPException(status_code=303, detail="Login required",
+                            headers={"Location": "/admin/login"})
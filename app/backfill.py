@@ -0,0 +1,30 @@
+"""Render stored live entries with the current markdown configuration.
+
+    python -m app.backfill
+
+Run after migrations on deploy. Entries rendered under an older
+configuration (or never rendered) get their body_html rewritten; until
+then they are rendered on every read.
+"""
+import asyncio
+import sys
+import time
+from app.database.engine import AsyncSessionLocal, engine
+from app.repositories.live_entry import LiveEntryRepository
+
+async def backfill() -> int:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await LiveEntryRepository(db).rerender_stale()
+    finally:
+        await engine.dispose()
+
+def main() -> int:
+    started = time.perf_counter()
+    rendered = asyncio.run(backfill())
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {rendered} live entries in {elapsed:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
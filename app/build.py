@@ -0,0 +1,64 @@
+"""Compile content/ into a prebuilt render artifact.
+
+    python -m app.build [output]
+
+Every post and page goes through the same rendering as at runtime, so
+broken front matter or duplicate slugs fail the build instead of a
+request in production. Outside development the app loads the artifact on
+startup and only renders files whose hash is not in it.
+"""
+import hashlib
+import os
+import sys
+import time
+from app.config import settings
+from app.services import pages, posts, render_cache
+
+def _sources(directory: str):
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".md"):
+            filepath = os.path.join(directory, filename)
+            with open(filepath, "rb") as f:
+                raw = f.read()
+            yield filepath, hashlib.sha256(raw).hexdigest(), raw.decode("utf-8")
+
+def build(output: str) -> dict[str, dict]:
+    entries: dict[str, dict] = {}
+    slugs: dict[str, str] = {}
+
+    for filepath, digest, raw in _sources(posts.POSTS_DIR):
+        rendered = posts.render_post(raw)
+        post = posts.post_from_render(rendered)
+        if post.slug in slugs:
+            raise ValueError(f"{filepath}: slug '{post.slug}' already used by {slugs[post.slug]}")
+        slugs[post.slug] = filepath
+        entries[render_cache.key(digest, posts.POST_EXTRAS)] = rendered
+
+    for filepath, digest, raw in _sources(pages.PAGES_DIR):
+        rendered = pages.render_page(raw)
+        pages.page_from_render(rendered)
+        entries[render_cache.key(digest, pages.PAGE_EXTRAS)] = rendered
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{output}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_cache.dumps(entries))
+    os.replace(tmp, output)
+    return entries
+
+def main(argv: list[str]) -> int:
+    output = argv[0] if argv else settings.content_artifact
+    started = time.perf_counter()
+    try:
+        entries = build(output)
+    except Exception as exc:
+        print(f"Content build failed: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Compiled {len(entries)} documents into {output} in {elapsed:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -16,6 +16,34 @@ class Settings(BaseSettings):
     site_author: str = "GidMaster"
     database_url: str = "sqlite+aiosqlite:///./blog.db"
     secret_key: str = "change-this-to-a-random-secret"
+    # SQLite tuning, applied on every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size_kib: int = 65536
+    # Connection pool for server databases (PostgreSQL)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    render_cache_path: str = "data/render_cache.sqlite3"  # empty disables
+    content_watch: bool = False
+    content_artifact: str = "build/content.json"
+    content_generation_file: str = "data/content-generation"
+    page_cache_size: int = 1024
+    posts_per_page: int = 10  # on the index and tag pages
+    related_posts: int = 3  # recommendations under each post, 0 disables
+    highlight_cache_size: int = 2048  # highlighted code blocks kept in memory
+    stream_templates: bool = False  # stream page cache misses as they render
+    gzip_level: int = 9
+    brotli_quality: int = 11
+    view_flush_interval: float = 5.0
+    live_queue_size: int = 64  # events a stream client may lag before eviction
+    live_heartbeat: float = 15.0
+    template_bytecode_dir: str = "data/jinja-bytecode"  # empty disables
+    image_cache_dir: str = "data/images"  # resized copies of content/images
 
     @property
     def trusted_hosts_list(self) -> list[str]:
@@ -1,7 +1,53 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from app.config import settings
 
-engine = create_async_engine(
+def _sqlite_pragmas() -> list[str]:
+    return [
+        # Readers no longer block on the writer (and vice versa)
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        # Safe with WAL: only the last commits may be lost on power failure
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        # Negative means KiB rather than pages
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in _sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+def engine_options(url: str) -> dict:
+    """Per-dialect create_async_engine() arguments for the given URL."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if backend == "sqlite":
+        # The driver-level timeout covers waits that happen before the pragmas run
+        return {"connect_args": {"timeout": settings.sqlite_busy_timeout_ms / 1000}}
+
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if backend == "postgresql" and parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+    return options
+
+def make_engine(url: str, echo: bool = False) -> AsyncEngine:
+    new_engine = create_async_engine(url, echo=echo, **engine_options(url))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+engine = make_engine(
     settings.database_url,
     echo=settings.app_env == "development",
 )
@@ -14,4 +60,4 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -1 +1 @@
-from app.database.models import post_stat, live_entry  # noqa: F401
\ No newline at end of file
+from app.database.models import post_stat, post_view_rollup, live_entry  # noqa: F401
\ No newline at end of file
@@ -1,13 +1,20 @@
 from datetime import datetime
-from sqlalchemy import Text, Boolean, DateTime, Integer, func
+from sqlalchemy import DDL, Text, Boolean, DateTime, Integer, Index, String, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database.base import Base
 
 class LiveEntry(Base):
     __tablename__ = "live_entries"
+    __table_args__ = (
+        # Feed order; keyset pagination scans it from either end
+        Index("ix_live_entries_feed", "pinned", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     body: Mapped[str] = mapped_column(Text, nullable=False)
+    # Rendered once on write; render_version says which configuration made it
+    body_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    render_version: Mapped[str | None] = mapped_column(String(16), nullable=True)
     pinned: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), nullable=False
@@ -15,3 +22,40 @@ class LiveEntry(Base):
 
     def __repr__(self) -> str:
         return f"<LiveEntry id{self.id} created_at={self.created_at}>"
+
+# ── Full-text search ─────────────────────────────────────
+# Not expressible as model metadata, so created by DDL events here and by
+# the matching migration; alembic/env.py leaves these names alone.
+
+FTS_TABLE = "live_entries_fts"  # SQLite FTS5, external content
+TSV_INDEX = "ix_live_entries_body_tsv"  # PostgreSQL GIN
+TSV_CONFIG = "english"
+
+SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "body, content='live_entries', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON live_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON live_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF body ON live_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END",
+)
+
+POSTGRES_FTS_DDL = (
+    f"CREATE INDEX IF NOT EXISTS {TSV_INDEX} ON live_entries "
+    f"USING gin (to_tsvector('{TSV_CONFIG}', body))",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(LiveEntry.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_FTS_DDL:
+    event.listen(LiveEntry.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+# The triggers go with the table, the FTS table has to be dropped explicitly
+event.listen(
+    LiveEntry.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
@@ -8,7 +8,7 @@ class PostStat(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     slug: Mapped[str] = mapped_column(String(200), unique=True, nullable=False, index=True)
-    view_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    view_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, index=True)
     first_viewed_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), nullable=True
     )
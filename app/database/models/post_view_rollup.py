@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.base import Base
+
+class PostViewRollup(Base):
+    """Views of one post within one hour or day (UTC, naive)."""
+    __tablename__ = "post_view_rollups"
+    __table_args__ = (
+        # Upsert target, and per-post time series
+        UniqueConstraint("slug", "period", "bucket_start", name="uq_post_view_rollups_bucket"),
+        # Top-N over a time range; covers the whole query
+        Index("ix_post_view_rollups_period_bucket", "period", "bucket_start", "slug", "views"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    slug: Mapped[str] = mapped_column(String(200), nullable=False)
+    period: Mapped[str] = mapped_column(String(8), nullable=False)  # "hour" | "day"
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    views: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PostViewRollup slug={self.slug} {self.period}={self.bucket_start} views={self.views}>"
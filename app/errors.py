@@ -1,11 +1,14 @@
 from fastapi import Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from app.templates import templates
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 async def http_exception_handler(request: Request, exc) -> HTMLResponse:
     code = exc.status_code
+    if 300 <= code < 400 and exc.headers and "Location" in exc.headers:
+        # Raised by require_admin to send anonymous visitors to the login page
+        return RedirectResponse(exc.headers["Location"], status_code=code)
     title, message = ERROR_MESSAGES.get(code, ("Error", str(exc.detail)))
     return templates.TemplateResponse(
         request,
@@ -0,0 +1,272 @@
+import hashlib
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterator
+import brotli
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.templates import templates
+
+# Rendered into cached post pages in place of the per-request view count
+VIEW_COUNT_HOLE = "\x00view_count\x00"
+
+# Bodies smaller than this are not worth a Content-Encoding
+MIN_COMPRESS_SIZE = 512
+
+# Streamed renders are sent in chunks of about this many characters
+STREAM_CHUNK_SIZE = 16384
+
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff"
+
+def _deflate(data: bytes, level: int, last: bool) -> bytes:
+    # Raw deflate segments ending in a full flush can be concatenated, which
+    # lets a holed body be compressed ahead of time except for the hole
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_FULL_FLUSH)
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A rendered response body, split at its holes if it has any.
+
+    ``gzip_parts`` holds one precompressed deflate segment per part;
+    ``brotli`` is only available for bodies without holes.
+    """
+    parts: tuple[bytes, ...]
+    etag: str
+    last_modified: float | None  # None: validated by ETag only
+    media_type: str
+    gzip_parts: tuple[bytes, ...] | None = None
+    brotli: bytes | None = None
+
+    def render(self, fill: str | None = None) -> bytes:
+        if len(self.parts) == 1:
+            return self.parts[0]
+        return (fill or "").encode().join(self.parts)
+
+    def render_gzip(self, fill: str | None = None) -> bytes:
+        if len(self.gzip_parts) == 1:
+            segments = list(self.gzip_parts)
+        else:
+            hole = _deflate((fill or "").encode(), 1, last=False)
+            segments = [self.gzip_parts[0]]
+            for part in self.gzip_parts[1:]:
+                segments += [hole, part]
+        body = self.render(fill)
+        trailer = struct.pack("<II", zlib.crc32(body), len(body) & 0xFFFFFFFF)
+        return _GZIP_HEADER + b"".join(segments) + trailer
+
+    def encodings(self) -> tuple[str, ...]:
+        available = []
+        if self.brotli is not None:
+            available.append("br")
+        if self.gzip_parts is not None:
+            available.append("gzip")
+        return tuple(available)
+
+class ResponseCache:
+    """Bounded LRU of rendered bodies."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CachedBody] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> CachedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: tuple, entry: CachedBody) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+page_cache = ResponseCache(settings.page_cache_size)
+
+def make_body(body: bytes, media_type: str, hole: str | None = None,
+              dated: bool = True) -> CachedBody:
+    """Split, fingerprint and precompress a body. CPU heavy, keep off the loop."""
+    parts = tuple(body.split(hole.encode())) if hole else (body,)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    # Bodies with holes differ per request, so only a weak validator is honest
+    etag = f'W/"{digest}"' if len(parts) > 1 else f'"{digest}"'
+
+    gzip_parts = None
+    brotli_body = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        gzip_parts = tuple(
+            _deflate(part, settings.gzip_level, last=i == len(parts) - 1)
+            for i, part in enumerate(parts)
+        )
+        if len(parts) == 1:
+            brotli_body = brotli.compress(body, quality=settings.brotli_quality)
+
+    return CachedBody(
+        parts=parts,
+        etag=etag,
+        last_modified=time.time() if dated else None,
+        media_type=media_type,
+        gzip_parts=gzip_parts,
+        brotli=brotli_body,
+    )
+
+def _render_template(request: Request, name: str, context: dict,
+                     hole: str | None) -> CachedBody:
+    response = templates.TemplateResponse(request, name, context)
+    return make_body(response.body, "text/html", hole)
+
+def _chunks(pieces: Iterator[str]) -> Iterator[str]:
+    """Coalesce Jinja's many small pieces into chunks worth a write.
+
+    The piece closing </head> is flushed at once, so the browser can
+    fetch stylesheets while the body is still rendering. Pieces are
+    never split, which keeps a hole (one {{ }} output) inside one chunk.
+    """
+    buffer: list[str] = []
+    size = 0
+    head_open = True
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if (head_open and "</head>" in piece) or size >= STREAM_CHUNK_SIZE:
+            head_open = head_open and "</head>" not in piece
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def _stream_template(key: tuple, name: str, context: dict, hole: str | None,
+                     fill: str | None) -> Iterator[bytes]:
+    # A sync generator: Starlette pulls each chunk on a worker thread
+    rendered = []
+    for chunk in _chunks(templates.get_template(name).generate(context)):
+        rendered.append(chunk)
+        yield (chunk.replace(hole, fill or "") if hole else chunk).encode()
+    # Only a render that ran to the end is cached
+    page_cache.set(key, make_body("".join(rendered).encode(), "text/html", hole))
+
+async def template_response(request: Request, name: str, context: dict, version: int,
+                            params: tuple = (), hole: str | None = None,
+                            fill: str | None = None) -> Response:
+    """Serve a template rendered once per page and content version.
+
+    ``version`` is that of the snapshot (post index, page) the context
+    was taken from. ``params`` are the parsed query parameters the page
+    depends on; any other query string shares the cached entry, so
+    tracking parameters cannot fill the cache, and templates must not
+    print ``request.url`` (see the ``site_url`` template global). With STREAM_TEMPLATES a
+    cache miss is streamed as it renders; it goes out without an ETag,
+    which the cached copy then provides.
+    """
+    key = (request.url.path, params, version)
+    entry = page_cache.get(key)
+    if entry is None and settings.stream_templates:
+        return StreamingResponse(
+            _stream_template(key, name, context, hole, fill),
+            media_type="text/html",
+            headers={"Cache-Control": "no-cache", "Vary": "Accept-Encoding"},
+        )
+    if entry is None:
+        entry = await run_in_threadpool(_render_template, request, name, context, hole)
+        page_cache.set(key, entry)
+    return cached_response(request, entry, fill=fill)
+
+async def cached_document(name: str, media_type: str, version: int,
+                          build: Callable[[], bytes]) -> CachedBody:
+    """Build a non-template document (feed, sitemap) once per content version.
+
+    Served without Last-Modified: no date of the posts changes when an
+    older one is edited or removed, and second-resolution dates can miss
+    quick edits, so readers revalidate with the strong ETag instead.
+    """
+    key = (name, version)
+    entry = page_cache.get(key)
+    if entry is None:
+        entry = await run_in_threadpool(lambda: make_body(build(), media_type, dated=False))
+        page_cache.set(key, entry)
+    return entry
+
+def _accepted_encodings(request: Request) -> set[str]:
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        quality = params.replace(" ", "").removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            pass
+        accepted.add(coding.strip().lower())
+    return accepted
+
+def _negotiate(request: Request, entry: CachedBody) -> str | None:
+    accepted = _accepted_encodings(request)
+    for encoding in entry.encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+def _variant_etag(etag: str, encoding: str | None) -> str:
+    # Each encoding is its own representation and needs its own validator
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def is_not_modified(request: Request, etag: str, last_modified: float | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+def cached_response(request: Request, entry: CachedBody, fill: str | None = None,
+                    cache_control: str = "no-cache") -> Response:
+    encoding = _negotiate(request, entry)
+    etag = _variant_etag(entry.etag, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = formatdate(entry.last_modified, usegmt=True)
+    if is_not_modified(request, etag, entry.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    if encoding == "br":
+        content = entry.brotli
+    elif encoding == "gzip":
+        content = entry.render_gzip(fill)
+    else:
+        content = entry.render(fill)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=entry.media_type, headers=headers)
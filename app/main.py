@@ -1,21 +1,54 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import HTTPException
 from contextlib import asynccontextmanager
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.config import settings
-from app.routers import blog, feed, live, seo
+from app.routers import assets, blog, feed, live, search, seo
 from app.routers import admin_panel
 from app.errors import http_exception_handler, server_error_handler
-from app.database.engine import engine
+from app.database.engine import engine, AsyncSessionLocal
 from app.database.base import Base
-from app.database.models import post_stat, live_entry  # noqa: F401
+from app.database.models import post_stat, post_view_rollup, live_entry  # noqa: F401
+from app.services import render_cache
+from app.services.assets import css_bundle
+from app.services.posts import get_post_index_async
+from app.services.view_counter import run_flusher
+from app.services.watcher import watch_content
+from app.templates import precompile
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    if settings.app_env != "development":
+        # Prebuilt renders from `python -m app.build`; warm the index, compile
+        # templates and bundle the CSS so the first request pays for none
+        render_cache.load_artifact(settings.content_artifact)
+        await get_post_index_async()
+        precompile()
+        css_bundle()
+
+    stop_watching = asyncio.Event()
+    watcher = None
+    if settings.content_watch:
+        watcher = asyncio.create_task(watch_content(stop_watching))
+
+    stop_flushing = asyncio.Event()
+    flusher = asyncio.create_task(
+        run_flusher(AsyncSessionLocal, stop_flushing, settings.view_flush_interval)
+    )
+
     yield
+
+    stop_watching.set()
+    if watcher:
+        await watcher
+    # Final flush of buffered views happens before the engine goes away
+    stop_flushing.set()
+    await flusher
     await engine.dispose()
 
 app = FastAPI(title=settings.app_title, lifespan=lifespan)
@@ -34,3 +67,5 @@ app.include_router(live.router)
 app.include_router(admin_panel.router)
 app.include_router(feed.router)
 app.include_router(seo.router)
+app.include_router(search.router)
+app.include_router(assets.router)
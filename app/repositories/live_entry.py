@@ -1,55 +1,344 @@
-from sqlalchemy import select, func
+import asyncio
+import base64
+import binascii
+import logging
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, Integer, Text, delete, insert, select, text, update, func, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.models.live_entry import LiveEntry
+from app.database.models.live_entry import FTS_TABLE, TSV_CONFIG, LiveEntry
+from app.schemas.live_entry import LiveEntryRecord
+from app.services.live import RENDER_VERSION, render_body
+from app.services.live_hub import publish_delete, publish_entry
+from app.services.search import MATCH_START, MATCH_STOP, mark_snippet, match_snippet, query_terms
+
+logger = logging.getLogger(__name__)
+
+# Dialects already warned about having no full-text search
+_unindexed_dialects: set[str] = set()
+
+# The feed is ordered by this key, newest first; ix_live_entries_feed
+# covers it so every page is an index range scan
+_FEED_ORDER = (LiveEntry.pinned, LiveEntry.created_at, LiveEntry.id)
+
+# Entry count kept in process and adjusted on create/delete. Other workers
+# write too, so it is re-read from the database after COUNT_TTL seconds.
+COUNT_TTL = 60.0
+_count: int | None = None
+_counted_at = 0.0
+
+def reset_count_cache() -> None:
+    global _count
+    _count = None
+
+def _adjust_count(delta: int) -> None:
+    global _count
+    if _count is not None:
+        _count = max(_count + delta, 0)
+
+# Rows per multi-row INSERT, and ids per IN (...) list
+BATCH_SIZE = 500
+
+def _chunks(ids: Sequence[int], size: int = BATCH_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def _render_rows(records: list[LiveEntryRecord]) -> list[dict]:
+    return [
+        {
+            "body": record.body,
+            "body_html": render_body(record.body),
+            "render_version": RENDER_VERSION,
+            "pinned": record.pinned,
+            "created_at": record.created_at,
+        }
+        for record in records
+    ]
+
+def encode_cursor(entry: LiveEntry) -> str:
+    raw = f"{int(entry.pinned)}|{entry.created_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[bool, datetime, int]:
+    """Raises ValueError for anything encode_cursor() did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        pinned, created_at, entry_id = raw.split("|")
+        return pinned == "1", datetime.fromisoformat(created_at), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+_SQLITE_SEARCH = text(f"""
+    SELECT e.id, e.created_at,
+           snippet({FTS_TABLE}, 0, :start, :stop, '…', 24) AS snippet
+    FROM {FTS_TABLE} JOIN live_entries AS e ON e.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH :match
+    ORDER BY bm25({FTS_TABLE})
+    LIMIT :limit
+""").columns(id=Integer, created_at=DateTime, snippet=Text)
+
+# Rank in the inner query, so ts_headline only runs for the rows returned
+_POSTGRES_SEARCH = text(f"""
+    SELECT e.id, e.created_at,
+           ts_headline('{TSV_CONFIG}', e.body, hits.query, :options) AS snippet
+    FROM (
+        SELECT id, query, ts_rank(to_tsvector('{TSV_CONFIG}', body), query) AS rank
+        FROM live_entries, plainto_tsquery('{TSV_CONFIG}', :terms) AS query
+        WHERE to_tsvector('{TSV_CONFIG}', body) @@ query
+        ORDER BY rank DESC
+        LIMIT :limit
+    ) AS hits
+    JOIN live_entries AS e ON e.id = hits.id
+    ORDER BY hits.rank DESC
+""").columns(id=Integer, created_at=DateTime, snippet=Text)
+
+@dataclass
+class LiveSearchHit:
+    id: int
+    created_at: datetime
+    snippet: str  # HTML, matches wrapped in <mark>
+
+@dataclass
+class LiveEntryPage:
+    entries: list[LiveEntry]
+    newer: str | None  # cursor for ?after=, None on the first page
+    older: str | None  # cursor for ?before=, None on the last page
 
 
 class LiveEntryRepository:
-    
+
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
     async def create(self, body: str, pinned: bool = False) -> LiveEntry:
-        entry = LiveEntry(body=body, pinned=pinned)
+        # Set here rather than by the database so cursors round-trip the
+        # exact stored value, microseconds included
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        entry = LiveEntry(
+            body=body,
+            body_html=render_body(body),
+            render_version=RENDER_VERSION,
+            pinned=pinned,
+            created_at=created_at,
+        )
         self.db.add(entry)
         await self.db.commit()
         await self.db.refresh(entry)
+        _adjust_count(1)
+        publish_entry("create", entry)
         return entry
-    
+
     async def get_all(self, limit: int = 50, offset: int = 0) -> list[LiveEntry]:
         result = await self.db.execute(
             select(LiveEntry)
-            .order_by(LiveEntry.pinned.desc(), LiveEntry.created_at.desc())
+            .order_by(*(column.desc() for column in _FEED_ORDER))
             .limit(limit)
             .offset(offset)
         )
         return list(result.scalars().all())
-    
+
+    async def get_page(self, limit: int = 20, before: str | None = None,
+                       after: str | None = None) -> LiveEntryPage:
+        """Keyset pagination over (pinned, created_at, id).
+
+        ``before`` pages towards older entries, ``after`` towards newer
+        ones; both take cursors from a previous LiveEntryPage.
+        """
+        key = tuple_(*_FEED_ORDER)
+        query = select(LiveEntry)
+        if after:
+            # Walk up from the cursor, then flip back to newest first
+            query = query.where(key > tuple_(*decode_cursor(after)))
+            query = query.order_by(*(column.asc() for column in _FEED_ORDER))
+        else:
+            if before:
+                query = query.where(key < tuple_(*decode_cursor(before)))
+            query = query.order_by(*(column.desc() for column in _FEED_ORDER))
+
+        result = await self.db.execute(query.limit(limit + 1))
+        entries = list(result.scalars().all())
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if after:
+            entries.reverse()
+
+        if not entries:
+            return LiveEntryPage(entries=[], newer=None, older=None)
+        if after:
+            newer = encode_cursor(entries[0]) if has_more else None
+            older = encode_cursor(entries[-1])
+        else:
+            newer = encode_cursor(entries[0]) if before else None
+            older = encode_cursor(entries[-1]) if has_more else None
+        return LiveEntryPage(entries=entries, newer=newer, older=older)
+
     async def count(self) -> int:
+        global _count, _counted_at
+        if _count is not None and time.monotonic() - _counted_at < COUNT_TTL:
+            return _count
         result = await self.db.execute(
             select(func.count()).select_from(LiveEntry)
         )
-        return result.scalar_one()
-    
+        _count = result.scalar_one()
+        _counted_at = time.monotonic()
+        return _count
+
     async def delete(self, entry_id: int) -> bool:
-        result = await self.db.execute(
-            select(LiveEntry).where(LiveEntry.id == entry_id)
-        )
-        entry = result.scalar_one_or_none()
-        if not entry:
-            return False
-        await self.db.delete(entry)
-        await self.db.commit()
-        return True
+        return await self.delete_many([entry_id]) == 1
 
     async def toggle_pin(self, entry_id: int) -> LiveEntry | None:
         result = await self.db.execute(
-            select(LiveEntry).where(LiveEntry.id == entry_id)
+            update(LiveEntry)
+            .where(LiveEntry.id == entry_id)
+            .values(pinned=~LiveEntry.pinned)
+            .returning(LiveEntry)
         )
         entry = result.scalar_one_or_none()
-        if not entry:
-            return None
-        entry.pinned = not entry.pinned
         await self.db.commit()
-        await self.db.refresh(entry)
+        if entry:
+            publish_entry("update", entry)
         return entry
-    
\ No newline at end of file
+
+    async def delete_many(self, ids: Sequence[int]) -> int:
+        """Delete by id in one transaction; returns how many existed."""
+        deleted: list[int] = []
+        for chunk in _chunks(ids):
+            result = await self.db.execute(
+                delete(LiveEntry).where(LiveEntry.id.in_(chunk)).returning(LiveEntry.id)
+            )
+            deleted += result.scalars().all()
+        await self.db.commit()
+        _adjust_count(-len(deleted))
+        for entry_id in deleted:
+            publish_delete(entry_id)
+        return len(deleted)
+
+    async def set_pinned(self, ids: Sequence[int], pinned: bool) -> int:
+        """Pin or unpin by id in one transaction; returns how many changed."""
+        changed: list[LiveEntry] = []
+        for chunk in _chunks(ids):
+            result = await self.db.execute(
+                update(LiveEntry)
+                .where(LiveEntry.id.in_(chunk), LiveEntry.pinned != pinned)
+                .values(pinned=pinned)
+                .returning(LiveEntry)
+            )
+            changed += result.scalars().all()
+        await self.db.commit()
+        for entry in changed:
+            publish_entry("update", entry)
+        return len(changed)
+
+    async def import_entries(self, records: AsyncIterable[LiveEntryRecord],
+                             batch_size: int = BATCH_SIZE) -> int:
+        """Insert records in multi-row batches, all in one transaction.
+
+        Nothing is committed unless every record makes it in. Imported
+        entries are history, so they are not pushed to stream clients.
+        """
+        imported = 0
+        batch: list[LiveEntryRecord] = []
+        try:
+            async for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    imported += await self._insert_batch(batch)
+                    batch = []
+            if batch:
+                imported += await self._insert_batch(batch)
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            raise
+        _adjust_count(imported)
+        return imported
+
+    async def _insert_batch(self, records: list[LiveEntryRecord]) -> int:
+        # Markdown rendering is CPU bound; keep it off the event loop
+        rows = await asyncio.to_thread(_render_rows, records)
+        await self.db.execute(insert(LiveEntry), rows)
+        return len(rows)
+
+    async def export(self, batch_size: int = BATCH_SIZE) -> AsyncIterator[LiveEntryRecord]:
+        """Stream every entry, oldest first, a batch of rows at a time."""
+        result = await self.db.stream(
+            select(LiveEntry.body, LiveEntry.pinned, LiveEntry.created_at)
+            .order_by(LiveEntry.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for body, pinned, created_at in result:
+            yield LiveEntryRecord(body=body, pinned=pinned, created_at=created_at)
+
+    async def rerender_stale(self, batch_size: int = 200) -> int:
+        """Re-render entries stored under another renderer configuration."""
+        rendered = 0
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(LiveEntry)
+                .where(LiveEntry.id > last_id)
+                .where(or_(
+                    LiveEntry.render_version.is_(None),
+                    LiveEntry.render_version != RENDER_VERSION,
+                ))
+                .order_by(LiveEntry.id)
+                .limit(batch_size)
+            )
+            entries = list(result.scalars().all())
+            if not entries:
+                return rendered
+            for entry in entries:
+                entry.body_html = render_body(entry.body)
+                entry.render_version = RENDER_VERSION
+            await self.db.commit()
+            rendered += len(entries)
+            last_id = entries[-1].id
+
+    async def search(self, query: str, limit: int = 20) -> list[LiveSearchHit]:
+        """Entries containing every query term, best first."""
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # Quoted, so user input is never read as FTS5 query syntax
+            result = await self.db.execute(_SQLITE_SEARCH, {
+                "match": " ".join(f'"{term}"' for term in terms),
+                "start": MATCH_START,
+                "stop": MATCH_STOP,
+                "limit": limit,
+            })
+        elif dialect == "postgresql":
+            result = await self.db.execute(_POSTGRES_SEARCH, {
+                "terms": " ".join(terms),
+                "options": f"StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxWords=35, MinWords=15",
+                "limit": limit,
+            })
+        else:
+            if dialect not in _unindexed_dialects:
+                _unindexed_dialects.add(dialect)
+                logger.warning("No full-text index on %s, live search falls back to LIKE", dialect)
+            return await self._search_like(terms, limit)
+
+        return [
+            LiveSearchHit(id=row.id, created_at=row.created_at, snippet=mark_snippet(row.snippet))
+            for row in result
+        ]
+
+    async def _search_like(self, terms: list[str], limit: int) -> list[LiveSearchHit]:
+        """Unranked substring search for databases without a full-text index."""
+        body = func.lower(LiveEntry.body)
+        result = await self.db.execute(
+            select(LiveEntry.id, LiveEntry.created_at, LiveEntry.body)
+            .where(*(body.contains(term, autoescape=True) for term in terms))
+            .order_by(LiveEntry.created_at.desc(), LiveEntry.id.desc())
+            .limit(limit)
+        )
+        return [
+            LiveSearchHit(id=row.id, created_at=row.created_at,
+                          snippet=mark_snippet(match_snippet(row.body, terms)))
+            for row in result
+        ]
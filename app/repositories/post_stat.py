@@ -1,41 +1,120 @@
-from sqlalchemy import select
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from app.database.models.post_stat import PostStat
+from app.database.models.post_view_rollup import PostViewRollup
+
+def naive_utc(moment: datetime) -> datetime:
+    """Naive UTC, as the DateTime columns store it; asyncpg rejects aware values."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Naive UTC start of the hour, as stored in post_view_rollups."""
+    return naive_utc(moment).replace(minute=0, second=0, microsecond=0)
 
 class PostStatRepository:
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    def _insert(self):
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql_insert
+        return sqlite_insert
+
     async def get_by_slug(self, slug: str) -> PostStat | None:
         result = await self.db.execute(
             select(PostStat).where(PostStat.slug == slug)
         )
         return result.scalar_one_or_none()
 
-    async def increment_view(self, slug: str) -> PostStat:
-        stat = await self.get_by_slug(slug)
-        now = datetime.now(timezone.utc)        
-
-        if stat is None:
-            stat = PostStat(
-                slug=slug,
-                view_count=1,
-                first_viewed_at=now,
-                last_viewed_at=now,
-            )
-            self.db.add(stat)
-        else:
-            stat.view_count += 1
-            stat.last_viewed_at = now
+    async def add_views(self, counts: dict[tuple[str, datetime], int],
+                        viewed_at: datetime | None = None) -> None:
+        """Add buffered views, keyed by (slug, hour bucket), in one transaction.
+
+        Totals go to post_stats and per-hour/per-day counts to
+        post_view_rollups, each as a single upsert without reading rows first.
+        """
+        if not counts:
+            return
+        now = naive_utc(viewed_at or datetime.now(timezone.utc))
+        insert = self._insert()
 
+        totals: dict[str, int] = {}
+        buckets: dict[tuple[str, str, datetime], int] = {}
+        for (slug, hour), n in counts.items():
+            totals[slug] = totals.get(slug, 0) + n
+            day = hour.replace(hour=0)
+            buckets[(slug, "hour", hour)] = buckets.get((slug, "hour", hour), 0) + n
+            buckets[(slug, "day", day)] = buckets.get((slug, "day", day), 0) + n
+
+        stmt = insert(PostStat).values([
+            {"slug": slug, "view_count": n, "first_viewed_at": now, "last_viewed_at": now}
+            for slug, n in totals.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostStat.slug],
+            set_={
+                "view_count": PostStat.view_count + stmt.excluded.view_count,
+                "last_viewed_at": stmt.excluded.last_viewed_at,
+            },
+        )
+        await self.db.execute(stmt)
+
+        rollups = insert(PostViewRollup).values([
+            {"slug": slug, "period": period, "bucket_start": start, "views": n}
+            for (slug, period, start), n in buckets.items()
+        ])
+        rollups = rollups.on_conflict_do_update(
+            index_elements=[PostViewRollup.slug, PostViewRollup.period, PostViewRollup.bucket_start],
+            set_={"views": PostViewRollup.views + rollups.excluded.views},
+        )
+        await self.db.execute(rollups)
         await self.db.commit()
-        await self.db.refresh(stat)
-        return stat
 
-    async def get_all_stats(self) -> list[PostStat]:
+    async def get_all_stats(self, limit: int | None = None) -> list[PostStat]:
+        query = select(PostStat).order_by(PostStat.view_count.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def top_posts(self, window: timedelta, limit: int = 10,
+                        now: datetime | None = None) -> list[tuple[str, int]]:
+        """Most viewed slugs in the trailing window, from the rollups.
+
+        Windows up to a day read hourly buckets, longer ones daily buckets.
+        """
+        start = hour_bucket(now or datetime.now(timezone.utc))
+        if window <= timedelta(days=1):
+            period = "hour"
+            since = start - window + timedelta(hours=1)
+        else:
+            period = "day"
+            since = start.replace(hour=0) - window + timedelta(days=1)
+
+        views = func.sum(PostViewRollup.views).label("views")
         result = await self.db.execute(
-            select(PostStat).order_by(PostStat.view_count.desc())
+            select(PostViewRollup.slug, views)
+            .where(PostViewRollup.period == period, PostViewRollup.bucket_start >= since)
+            .group_by(PostViewRollup.slug)
+            .order_by(views.desc())
+            .limit(limit)
         )
-        return list(result.scalars().all())
+        return [(slug, total) for slug, total in result.all()]
+
+    async def view_series(self, slug: str, period: str = "day",
+                          since: datetime | None = None) -> list[tuple[datetime, int]]:
+        query = (
+            select(PostViewRollup.bucket_start, PostViewRollup.views)
+            .where(PostViewRollup.slug == slug, PostViewRollup.period == period)
+            .order_by(PostViewRollup.bucket_start)
+        )
+        if since is not None:
+            query = query.where(PostViewRollup.bucket_start >= since)
+        result = await self.db.execute(query)
+        return [(start, n) for start, n in result.all()]
@@ -1,21 +1,31 @@
-from fastapi import APIRouter, Request, Depends, Form
-from fastapi.responses import RedirectResponse, HTMLResponse
+import json
+from datetime import timedelta
+from fastapi import APIRouter, Request, Depends, Form, HTTPException
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.templates import templates
 from app.database.engine import get_db
 from app.repositories.post_stat import PostStatRepository
 from app.repositories.live_entry import LiveEntryRepository
-from app.schemas.live_entry import LiveEntryView
+from app.schemas.live_entry import LiveEntryRecord, LiveEntryView
+from app.services.live import iter_ndjson
+from app.services.markdown import highlight_cache
 from app.auth import (
     create_session, verify_session, get_session,
     require_admin, SESSION_COOKIE, SESSION_MAX_AGE
 )
 from app.config import settings
-from app.routers.live import render_body
 import markdown2
 
 router = APIRouter(prefix="/admin")
 
+TOP_POSTS_LIMIT = 10
+TOP_POSTS_WINDOWS = {
+    "24h": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
 # ── Auth ─────────────────────────────────────────────────
 
 @router.get("/login")
@@ -69,12 +79,16 @@ async def dashboard(
     post_repo = PostStatRepository(db)
     live_repo = LiveEntryRepository(db)
 
-    post_stats = await post_repo.get_all_stats()
+    post_stats = await post_repo.get_all_stats(limit=TOP_POSTS_LIMIT)
+    top_posts = {
+        label: await post_repo.top_posts(window, limit=TOP_POSTS_LIMIT)
+        for label, window in TOP_POSTS_WINDOWS.items()
+    }
     recent_entries = await live_repo.get_all(limit=5)
     total_entries = await live_repo.count()
 
     entry_views = [
-        LiveEntryView.from_model(e, render_body(e.body))
+        LiveEntryView.from_model(e)
         for e in recent_entries
     ]
 
@@ -84,30 +98,50 @@ async def dashboard(
         {
             "request": request,
             "post_stats": post_stats,
+            "top_posts": top_posts,
             "recent_entries": entry_views,
             "total_entries": total_entries,
+            "highlight_stats": highlight_cache.stats(),
         }
     )
 
+@router.get("/stats/{slug}")
+async def post_stats_series(
+    slug: str,
+    period: str = "day",
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(require_admin)
+):
+    if period not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="period must be 'hour' or 'day'")
+    series = await PostStatRepository(db).view_series(slug, period=period)
+    return {
+        "slug": slug,
+        "period": period,
+        "points": [{"start": start.isoformat(), "views": views} for start, views in series],
+    }
+
 # ── Live entries management ──────────────────────────────
 
 @router.get("/live")
 async def live_manage(
     request: Request,
-    page: int = 1,
+    before: str | None = None,
+    after: str | None = None,
     db: AsyncSession = Depends(get_db),
     _: None = Depends(require_admin)
 ):
     repo = LiveEntryRepository(db)
     PAGE_SIZE = 20
-    offset = (page - 1) * PAGE_SIZE
-    entries = await repo.get_all(limit=PAGE_SIZE, offset=offset)
+    try:
+        page = await repo.get_page(limit=PAGE_SIZE, before=before, after=after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     total = await repo.count()
-    total_pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
 
     entry_views = [
-        LiveEntryView.from_model(e, render_body(e.body))
-        for e in entries
+        LiveEntryView.from_model(e)
+        for e in page.entries
     ]
 
     return templates.TemplateResponse(
@@ -116,8 +150,8 @@ async def live_manage(
         {
             "request": request,
             "entries": entry_views,
-            "page": page,
-            "total_pages": total_pages,
+            "newer": page.newer,
+            "older": page.older,
             "total": total,
         }
     )
@@ -144,7 +178,6 @@ async def delete_entry(
     repo = LiveEntryRepository(db)
     deleted = await repo.delete(entry_id)
     if not deleted:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Entry not found")
     return RedirectResponse(url="/admin/live", status_code=303)
 
@@ -160,11 +193,65 @@ async def pin_entry(
     return RedirectResponse(url="/admin/live", status_code=303)
 
 
+@router.post("/live/bulk")
+async def bulk_entries(
+    action: str = Form(...),
+    ids: list[int] = Form(default=[]),
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(require_admin)
+):
+    repo = LiveEntryRepository(db)
+    if action == "delete":
+        await repo.delete_many(ids)
+    elif action in ("pin", "unpin"):
+        await repo.set_pinned(ids, pinned=action == "pin")
+    else:
+        raise HTTPException(status_code=400, detail="action must be delete, pin or unpin")
+    return RedirectResponse(url="/admin/live", status_code=303)
+
+@router.post("/live/import")
+async def import_entries(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(require_admin)
+):
+    """NDJSON request body, one {"body", "pinned", "created_at"} per line."""
+    async def records():
+        async for lineno, data in iter_ndjson(request.stream()):
+            try:
+                yield LiveEntryRecord.from_dict(data)
+            except ValueError as exc:
+                raise ValueError(f"line {lineno}: {exc}") from exc
+
+    try:
+        imported = await LiveEntryRepository(db).import_entries(records())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"imported": imported}
+
+@router.get("/live/export")
+async def export_entries(
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(require_admin)
+):
+    async def lines():
+        async for record in LiveEntryRepository(db).export():
+            yield json.dumps(record.to_dict(), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="live-entries.ndjson"'},
+    )
+
+
 @router.post("/cache/invalidate")
 async def cache_invalidate(
     request: Request,
     _: None = Depends(require_admin)
 ):
     from app.services.posts import invalidate_cache
+    from app.services.generation import bump
     invalidate_cache()
+    bump()
     return {"status": "ok", "message": "Cache invalidated"}
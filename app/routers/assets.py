@@ -0,0 +1,36 @@
+import asyncio
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import FileResponse
+from app.http_cache import CachedBody, cached_response, make_body
+from app.services.assets import css_bundle
+from app.services.images import derivative
+
+router = APIRouter()
+
+# The name carries the content hash, so the response never changes
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Derivatives keep the image's name, which may be reused for a new picture
+DERIVATIVE_CACHE = "public, max-age=86400"
+
+_bundle_body: CachedBody | None = None
+
+@router.get("/assets/{name}", include_in_schema=False)
+async def asset(request: Request, name: str):
+    global _bundle_body
+    bundle = css_bundle()
+    if name != bundle.name:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    if _bundle_body is None:
+        _bundle_body = make_body(bundle.body, "text/css")
+    return cached_response(request, _bundle_body, cache_control=IMMUTABLE)
+
+@router.get("/img/{width}/{name}", include_in_schema=False)
+async def image(width: int, name: str):
+    """A resized copy of content/images/<name>, WebP when the name ends in .webp."""
+    webp = name.endswith(".webp")
+    source = name.removesuffix(".webp") if webp else name
+    # Resized on first request, then served from disk
+    path = await asyncio.to_thread(derivative, source, width, webp)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, headers={"Cache-Control": DERIVATIVE_CACHE})
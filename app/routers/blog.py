@@ -1,48 +1,88 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.templates import templates
+from app.config import settings
+from app.http_cache import VIEW_COUNT_HOLE, template_response
 from app.services.pages import get_page
-from app.services.posts import get_all_posts, get_post_by_slug, get_all_tags, get_series_posts
+from app.services.posts import get_post_index_async, listing_url
 from app.database.engine import get_db
 from app.repositories.post_stat import PostStatRepository
+from app.services.view_counter import view_counter
 
 router = APIRouter()
 
-@router.get("/")
-async def index(request: Request, tag: str | None = None):
-    posts = get_all_posts(tag=tag)
-    tags = get_all_tags()
-    return templates.TemplateResponse(
+async def _listing(request: Request, number: int, tag: str | None = None):
+    index = await get_post_index_async()
+    page = index.page(number, tag)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return await template_response(
         request,
         "index.html",
-        {"request": request, "posts": posts, "tags": tags, "active_tag": tag}
+        {
+            "request": request,
+            "page": page,
+            "posts": page.posts,
+            "tags": index.tags,
+            "active_tag": tag,
+            "canonical_url": settings.site_url.rstrip("/") + listing_url(page.number, tag),
+            "newer_url": listing_url(page.number - 1, tag) if page.has_newer else None,
+            "older_url": listing_url(page.number + 1, tag) if page.has_older else None,
+        },
+        index.version,
+        params=(page.number,),
     )
 
+@router.get("/")
+async def index(request: Request, tag: str | None = None, page: int = 1):
+    # ?tag= predates /tag/{tag}; old links move to the canonical URL
+    if tag is not None:
+        return RedirectResponse(listing_url(page, tag), status_code=301)
+    return await _listing(request, page)
+
+@router.get("/tag/{tag}")
+async def tag_index(request: Request, tag: str):
+    return await _listing(request, 1, tag)
+
+@router.get("/tag/{tag}/page/{number}")
+async def tag_page(request: Request, tag: str, number: int):
+    if number == 1:
+        return RedirectResponse(listing_url(1, tag), status_code=301)
+    return await _listing(request, number, tag)
+
 @router.get("/post/{slug}")
 async def post_detail(
     request: Request,
     slug: str,
     db: AsyncSession = Depends(get_db)
 ):
-    post = get_post_by_slug(slug)
+    index = await get_post_index_async()
+    post = index.by_slug.get(slug)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    repo = PostStatRepository(db)
-    stat = await repo.increment_view(slug)
-
     # Fetch sibling posts only when the post belongs to a series
-    series_posts = get_series_posts(post.series) if post.series else []
+    series_posts = index.by_series.get(post.series, ()) if post.series else ()
 
-    return templates.TemplateResponse(
+    # Views are buffered and flushed in batches; show persisted + pending
+    view_counter.record(slug)
+    stat = await PostStatRepository(db).get_by_slug(slug)
+    view_count = (stat.view_count if stat else 0) + view_counter.pending(slug)
+
+    # The page is cached with a hole where the view count goes
+    return await template_response(
         request,
         "post.html",
         {
             "request": request,
             "post": post,
-            "view_count": stat.view_count,
+            "view_count": VIEW_COUNT_HOLE,
             "series_posts": series_posts,
-        }
+            "related_posts": index.related.get(slug, ()),
+        },
+        index.version,
+        hole=VIEW_COUNT_HOLE,
+        fill=str(view_count),
     )
 
 @router.get("/about")
@@ -50,19 +90,11 @@ async def about(request: Request):
     page = get_page("about")
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
-    return templates.TemplateResponse(
-        request,
-        "page.html",
-        {"request": request, "page": page}
-    )
+    return await template_response(request, "page.html", {"request": request, "page": page}, page.version)
 
 @router.get("/page/{slug}")
 async def static_page(request: Request, slug: str):
     page = get_page(slug)
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
-    return templates.TemplateResponse(
-        request,
-        "page.html",
-        {"request": request, "page": page}
-    )
+    return await template_response(request, "page.html", {"request": request, "page": page}, page.version)
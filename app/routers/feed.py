@@ -1,47 +1,53 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
 from datetime import datetime, timezone
-from app.services.posts import get_all_posts
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+from app.http_cache import cached_document, cached_response
+from app.services.posts import Post, get_post_index_async
 from app.config import settings
 
 router = APIRouter()
 
-def _build_rss(request: Request) -> str:
-    posts = get_all_posts()
+def _post_datetime(post: Post) -> datetime:
+    return datetime(post.date.year, post.date.month, post.date.day, tzinfo=timezone.utc)
+
+def _build_rss(posts: tuple[Post, ...]) -> bytes:
+    """Render the feed; it only depends on the posts, so it is byte-stable."""
     site_url = settings.site_url
 
-    items = ""
+    items = []
     for post in posts:
-        url = f"{site_url}/post/{post.slug}"
-        pub_date = datetime(
-            post.date.year,
-            post.date.month,
-            post.date.day
-        ).strftime("%a, %d %b %Y 00:00:00+0000")
-
-        items += f"""
+        url = escape(f"{site_url}/post/{post.slug}")
+        items.append(f"""
         <item>
-            <title>{post.title}</title>
+            <title>{escape(post.title)}</title>
             <link>{url}</link>
             <guid isPermaLink="true">{url}</guid>
-            <pubDate>{pub_date}</pubDate>
-            <description>{post.summary}</description>
-        </item>"""
+            <pubDate>{format_datetime(_post_datetime(post))}</pubDate>
+            <description>{escape(post.summary)}</description>
+        </item>""")
+
+    # Derived from the newest post rather than now(), so the same posts
+    # always produce the same bytes (and ETag) on every worker
+    newest = _post_datetime(posts[0]) if posts else None
+    last_build = f"<lastBuildDate>{format_datetime(newest)}</lastBuildDate>" if newest else ""
 
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
+    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0">
     <channel>
-        <title>{settings.app_title}</title>
-        <link>{site_url}</link>
-        <description>{settings.site_description}</description>
+        <title>{escape(settings.app_title)}</title>
+        <link>{escape(site_url)}</link>
+        <description>{escape(settings.site_description)}</description>
         <language>en-us</language>
-        <managingEditor>{settings.site_author}</managingEditor>
-        <lastBuildDate>{datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S+0000")}</lastBuildDate>
-        {items}
+        <managingEditor>{escape(settings.site_author)}</managingEditor>
+        {last_build}
+        {"".join(items)}
     </channel>
 </rss>"""
+    return xml.encode()
 
 @router.get("/feed.xml")
 async def rss_feed(request: Request):
-    xml = _build_rss(request)
-    return Response(content=xml, media_type="application/rss+xml")
+    index = await get_post_index_async()
+    entry = await cached_document("feed.xml", "application/rss+xml", index.version, lambda: _build_rss(index.posts))
+    return cached_response(request, entry)
@@ -1,35 +1,34 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Form
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, Request, Depends, HTTPException, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.templates import templates
 from app.database.engine import get_db
 from app.repositories.live_entry import LiveEntryRepository
 from app.schemas.live_entry import LiveEntryView
+from app.services.live_hub import live_hub
 from app.config import settings
-import markdown2
 
 router = APIRouter(prefix="/live")
 
 PAGE_SIZE = 20
 
-def render_body(text: str) -> str:
-    return markdown2.markdown(text, extras={"fenced-code-blocks": {"cssclass": "highlight"}})
-
 @router.get("/")
 async def live_index(
     request: Request,
-    page: int = 1,
+    before: str | None = None,
+    after: str | None = None,
     db: AsyncSession = Depends(get_db)
 ):
     repo = LiveEntryRepository(db)
-    offset = (page - 1) * PAGE_SIZE
-    entries = await repo.get_all(limit=PAGE_SIZE, offset=offset)
+    try:
+        page = await repo.get_page(limit=PAGE_SIZE, before=before, after=after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     total = await repo.count()
-    total_pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
 
     entry_views = [
-        LiveEntryView.from_model(entry, render_body(entry.body))
-        for entry in entries
+        LiveEntryView.from_model(entry)
+        for entry in page.entries
     ]
 
     return templates.TemplateResponse(
@@ -38,12 +37,40 @@ async def live_index(
         {
             "request": request,
             "entries": entry_views,
-            "page": page,
-            "total_pages": total_pages,
-            "total": total,            
+            "newer": page.newer,
+            "older": page.older,
+            "total": total,
         }
     )
 
+@router.get("/stream")
+async def live_stream():
+    """Server-Sent Events: every feed change as rendered entry HTML."""
+    async def events():
+        # Reconnect quickly after a restart or an eviction
+        yield "retry: 3000\n\n"
+        async for event in live_hub.listen(settings.live_heartbeat):
+            yield event.sse() if event else ": ping\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def live_socket(websocket: WebSocket):
+    """Same events as /live/stream, as JSON text frames."""
+    await websocket.accept()
+    try:
+        async for event in live_hub.listen(settings.live_heartbeat):
+            if event is None:
+                await websocket.send_text('{"type": "ping"}')
+            else:
+                await websocket.send_text(event.data)
+    except WebSocketDisconnect:
+        pass
+
 @router.post("/entry")
 async def create_entry(
     request: Request,
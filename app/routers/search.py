@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Request, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.templates import templates
+from app.database.engine import get_db
+from app.repositories.live_entry import LiveEntryRepository
+from app.services.posts import get_post_index_async
+
+router = APIRouter()
+
+RESULTS_LIMIT = 20
+MAX_QUERY_LENGTH = 200
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: str = "",
+    db: AsyncSession = Depends(get_db)
+):
+    query = q.strip()[:MAX_QUERY_LENGTH]
+    post_hits = []
+    live_hits = []
+    if query:
+        index = await get_post_index_async()
+        post_hits = index.search.search(query, limit=RESULTS_LIMIT)
+        live_hits = await LiveEntryRepository(db).search(query, limit=RESULTS_LIMIT)
+
+    return templates.TemplateResponse(
+        request,
+        "search.html",
+        {
+            "request": request,
+            "query": query,
+            "post_hits": post_hits,
+            "live_hits": live_hits,
+        }
+    )
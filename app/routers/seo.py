@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import Response
-from datetime import timezone
-from app.services.posts import get_all_posts
+from xml.sax.saxutils import escape
+from app.http_cache import cached_document, cached_response
+from app.services.posts import PostIndex, get_post_index_async, listing_url
 from app.config import settings
 
 router = APIRouter()
@@ -23,10 +24,9 @@ async def google_verification():
     return Response(content=content, media_type="text/plain")
 
 
-@router.get("/sitemap.xml", include_in_schema=False)
-async def sitemap():
-    posts = get_all_posts()
+def _build_sitemap(index: PostIndex) -> bytes:
     site_url = settings.site_url.rstrip("/")
+    posts = index.posts
 
     # Static pages that should always be in the sitemap
     static_urls = [
@@ -45,20 +45,37 @@ async def sitemap():
         for post in posts
     ]
 
-    all_urls = static_urls + post_urls
+    # Listing pages past the first, then every page of every tag
+    listing_urls = [
+        {"loc": f"{site_url}{listing_url(page.number)}", "priority": "0.4", "changefreq": "weekly"}
+        for page in index.pages[1:]
+    ]
+    for tag, pages in index.tag_pages.items():
+        listing_urls += [
+            {"loc": f"{site_url}{listing_url(page.number, tag)}", "priority": "0.4", "changefreq": "weekly"}
+            for page in pages
+        ]
+
+    all_urls = static_urls + post_urls + listing_urls
 
-    url_entries = ""
+    url_entries = []
     for url in all_urls:
         lastmod_line = f"\n        <lastmod>{url['lastmod']}</lastmod>" if "lastmod" in url else ""
-        url_entries += f"""
+        url_entries.append(f"""
     <url>
-        <loc>{url['loc']}</loc>{lastmod_line}
+        <loc>{escape(url['loc'])}</loc>{lastmod_line}
         <changefreq>{url['changefreq']}</changefreq>
         <priority>{url['priority']}</priority>
-    </url>"""
+    </url>""")
 
     xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{url_entries}
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(url_entries)}
 </urlset>"""
 
-    return Response(content=xml, media_type="application/xml")
+    return xml.encode()
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def sitemap(request: Request):
+    index = await get_post_index_async()
+    entry = await cached_document("sitemap.xml", "application/xml", index.version, lambda: _build_sitemap(index))
+    return cached_response(request, entry)
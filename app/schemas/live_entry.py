@@ -1,6 +1,8 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from app.database.models.live_entry import LiveEntry
+from app.services.live import RENDER_VERSION, render_body
+from app.services.markdown import has_math
 
 @dataclass
 class LiveEntryView:
@@ -9,13 +11,56 @@ class LiveEntryView:
     body_html: str
     pinned: bool
     created_at: datetime
+    has_math: bool = False
 
     @classmethod
-    def from_model(cls, entry: LiveEntry, rendered: str) -> "LiveEntryView":
+    def from_model(cls, entry: LiveEntry) -> "LiveEntryView":
+        # Stored HTML from an older renderer configuration (or none, before
+        # the backfill ran) is rendered on the fly rather than shown stale
+        if entry.body_html is not None and entry.render_version == RENDER_VERSION:
+            body_html = entry.body_html
+        else:
+            body_html = render_body(entry.body)
         return cls(
             id=entry.id,
             body=entry.body,
-            body_html=rendered,
+            body_html=body_html,
             pinned=entry.pinned,
             created_at=entry.created_at,
+            has_math=has_math(body_html),
         )
+
+@dataclass
+class LiveEntryRecord:
+    """One line of an NDJSON import or export."""
+    body: str
+    pinned: bool
+    created_at: datetime  # naive UTC, like the column
+
+    @classmethod
+    def from_dict(cls, data) -> "LiveEntryRecord":
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        body = data.get("body")
+        if not isinstance(body, str) or not body.strip():
+            raise ValueError("'body' must be a non-empty string")
+        pinned = data.get("pinned", False)
+        if not isinstance(pinned, bool):
+            raise ValueError("'pinned' must be true or false")
+        created_at = data.get("created_at")
+        if created_at is None:
+            moment = datetime.now(timezone.utc)
+        elif isinstance(created_at, str):
+            moment = datetime.fromisoformat(created_at)
+        else:
+            raise ValueError("'created_at' must be an ISO 8601 string")
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return cls(body=body, pinned=pinned, created_at=moment)
+
+    def to_dict(self) -> dict:
+        return {
+            "body": self.body,
+            "pinned": self.pinned,
+            "created_at": self.created_at.isoformat(),
+        }
@@ -0,0 +1,54 @@
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from app.config import settings
+
+CSS_DIR = "app/static/css"
+
+# Concatenation order; main.css goes first because it holds the @import
+CSS_FILES = ("main.css", "highlight.css", "series.css")
+
+_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND = re.compile(r"\s*([{};,>])\s*")
+
+@dataclass(frozen=True)
+class Bundle:
+    name: str  # bundle.<hash>.css, so it can be cached forever
+    body: bytes
+
+def minify_css(css: str) -> str:
+    """Drop comments and redundant whitespace, leaving strings alone."""
+    parts = _STRING.split(_COMMENT.sub("", css))
+    for i in range(0, len(parts), 2):  # odd indexes are string literals
+        code = _SPACE.sub(" ", parts[i])
+        code = _AROUND.sub(r"\1", code)
+        code = code.replace(": ", ":").replace(";}", "}")
+        parts[i] = code
+    return "".join(parts).strip()
+
+def build_css_bundle(directory: str = CSS_DIR, files: tuple[str, ...] = CSS_FILES) -> Bundle:
+    sources = []
+    for filename in files:
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            sources.append(minify_css(f.read()))
+    body = "\n".join(sources).encode()
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    return Bundle(name=f"bundle.{digest}.css", body=body)
+
+_bundle: Bundle | None = None
+
+def css_bundle() -> Bundle:
+    """Built on first use, then fixed for the life of the process."""
+    global _bundle
+    if _bundle is None:
+        _bundle = build_css_bundle()
+    return _bundle
+
+def stylesheets() -> list[str]:
+    """Stylesheet URLs for base.html: the bundle, or the sources in development."""
+    if settings.app_env == "development":
+        return [f"/static/css/{filename}" for filename in CSS_FILES]
+    return [f"/assets/{css_bundle().name}"]
@@ -0,0 +1,36 @@
+import itertools
+import os
+import time
+from app.config import settings
+
+# A small file on the shared data volume. Its identity (inode + mtime)
+# is the content generation: every worker compares it against what it
+# last saw and drops its caches when it moves.
+GENERATION_FILE = settings.content_generation_file
+
+# Process-local content versions. Every post index or page snapshot that
+# differs from the one before gets a new number; response caches key on
+# the number carried by the snapshot they rendered.
+_versions = itertools.count(1)  # next() is atomic, advance() runs on several threads
+
+def advance() -> int:
+    return next(_versions)
+
+def token() -> tuple[int, int] | None:
+    """Return the current shared generation - one stat() call."""
+    try:
+        st = os.stat(GENERATION_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+def bump() -> None:
+    """Tell every worker sharing GENERATION_FILE that content changed."""
+    directory = os.path.dirname(GENERATION_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{GENERATION_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(f"{time.time_ns()}\n")
+    # A fresh inode guarantees a new token even within one mtime tick
+    os.replace(tmp, GENERATION_FILE)
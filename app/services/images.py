@@ -0,0 +1,162 @@
+import html
+import logging
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.config import settings
+
+IMAGES_DIR = "content/images"
+
+# Widths generated below the original; the original size is always offered too
+WIDTHS = (480, 960, 1440)
+# The content column: 720px wide with 2rem padding on either side
+SIZES = "(max-width: 720px) calc(100vw - 4rem), 656px"
+
+# Formats the pipeline resizes, by extension: Pillow format and save options
+FORMATS = {
+    ".jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ".jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ".png": ("PNG", {"optimize": True}),
+}
+WEBP = ("WEBP", {"quality": 80, "method": 6})
+
+_IMG = re.compile(r"<img\b([^>]*?)\s*/?>")
+_SRC = re.compile(r'\ssrc="/images/([^"/]+)"')
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ImageInfo:
+    name: str
+    width: int
+    height: int
+
+    def widths(self) -> tuple[int, ...]:
+        return tuple(w for w in WIDTHS if w < self.width) + (self.width,)
+
+# Intrinsic sizes keyed by name, with the (mtime_ns, size) they were read at
+_info: dict[str, tuple[int, int, ImageInfo | None]] = {}
+_lock = threading.Lock()
+
+def image_info(name: str) -> ImageInfo | None:
+    """Display size of an image in IMAGES_DIR, or None if it is not resizable."""
+    if os.path.basename(name) != name or os.path.splitext(name)[1].lower() not in FORMATS:
+        return None
+    path = os.path.join(IMAGES_DIR, name)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    cached = _info.get(name)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    info = None
+    try:
+        # Only reads the header, the pixels stay on disk
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):  # rotated by EXIF
+                width, height = height, width
+        info = ImageInfo(name, width, height)
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Cannot read image %s", path)
+    _info[name] = (st.st_mtime_ns, st.st_size, info)
+    return info
+
+def rewrite_image_paths(content_html: str) -> str:
+    """Point relative image sources (``../images/x.png``) at the /images mount."""
+    def replace(match):
+        src = match.group(1)
+        if src.startswith(("http://", "https://", "/", "data:")):
+            return match.group(0)
+        src = src.lstrip("./")
+        src = os.path.basename(src)
+        return f'src="/images/{src}"'
+    return re.sub(r'src="([^"]*)"', replace, content_html)
+
+def shows_image(content_html: str, names: set[str]) -> bool:
+    """Whether rendered HTML displays any of the images ``names``."""
+    return any(f'src="/images/{html.escape(name)}"' in content_html for name in names)
+
+def derivative_url(name: str, width: int, webp: bool) -> str:
+    return f"/img/{width}/{name}{'.webp' if webp else ''}"
+
+def _srcset(info: ImageInfo, webp: bool) -> str:
+    candidates = []
+    for width in info.widths():
+        if width == info.width and not webp:
+            url = f"/images/{info.name}"  # the original is the largest JPEG/PNG
+        else:
+            url = derivative_url(info.name, width, webp)
+        candidates.append(f"{url} {width}w")
+    return ", ".join(candidates)
+
+def responsive_images(content_html: str) -> str:
+    """Turn <img src="/images/..."> into a <picture> with WebP and sized fallbacks.
+
+    Adds srcset/sizes, the intrinsic width and height so the layout does
+    not shift while loading, and lazy loading. Images that cannot be
+    resized are left as they are.
+    """
+    def replace(match: re.Match) -> str:
+        attrs = match.group(1)
+        src = _SRC.search(attrs)
+        info = image_info(html.unescape(src.group(1))) if src else None
+        if info is None or " srcset=" in attrs:
+            return match.group(0)
+        return (
+            f'<picture><source type="image/webp" srcset="{_srcset(info, True)}" sizes="{SIZES}">'
+            f'<img{attrs} srcset="{_srcset(info, False)}" sizes="{SIZES}" '
+            f'width="{info.width}" height="{info.height}" loading="lazy" decoding="async" />'
+            f"</picture>"
+        )
+    return _IMG.sub(replace, content_html)
+
+def derivative(name: str, width: int, webp: bool) -> str | None:
+    """Path of a resized copy, generating it on first use; blocking.
+
+    ``width`` is rounded up to the nearest width responsive_images()
+    offers for this image, so URLs cannot request arbitrary sizes and a
+    srcset rendered before the image was replaced keeps working.
+    """
+    info = image_info(name)
+    if info is None:
+        return None
+    width = next((w for w in info.widths() if w >= width), info.width)
+
+    source = os.path.join(IMAGES_DIR, name)
+    if width == info.width and not webp:
+        return source
+    target = os.path.join(settings.image_cache_dir, str(width), name + (".webp" if webp else ""))
+    try:
+        if os.stat(target).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            return target
+    except FileNotFoundError:
+        pass
+
+    # One image at a time: resizing is CPU and memory heavy
+    with _lock:
+        fmt, options = WEBP if webp else FORMATS[os.path.splitext(name)[1].lower()]
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if width < image.width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Unique across threads and worker processes sharing the cache
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, fmt, **options)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+    return target
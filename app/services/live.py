@@ -0,0 +1,42 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from app.services import render_cache
+from app.services.markdown import markdown
+
+LIVE_EXTRAS = {"fenced-code-blocks": {"cssclass": "highlight"}}
+
+# Bump whenever render_body() changes beyond markdown2 and its extras
+LIVE_RENDERER_VERSION = 1
+
+# Stored next to each entry's body_html; entries rendered under another
+# configuration are re-rendered on read and rewritten by `python -m app.backfill`
+RENDER_VERSION = render_cache.fingerprint(LIVE_EXTRAS, LIVE_RENDERER_VERSION)
+
+def render_body(text: str) -> str:
+    return markdown(text, extras=LIVE_EXTRAS)
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """Decode an NDJSON byte stream line by line, without buffering it whole.
+
+    Yields (line number, object); blank lines are skipped. Raises
+    ValueError naming the line for anything that is not JSON.
+    """
+    buffer = b""
+    lineno = 0
+
+    def decode(line: bytes):
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {lineno}: {exc}") from exc
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                yield lineno, decode(line)
+    if buffer.strip():
+        lineno += 1
+        yield lineno, decode(buffer)
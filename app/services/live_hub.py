@@ -0,0 +1,103 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from app.config import settings
+from app.database.models.live_entry import LiveEntry
+from app.schemas.live_entry import LiveEntryView
+from app.templates import templates
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class LiveEvent:
+    """One change to the feed, encoded once for every subscriber."""
+    kind: str  # "create", "update", "delete" or "reset"
+    entry_id: int | None = None
+    html: str = ""
+    data: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        payload = json.dumps({"type": self.kind, "id": self.entry_id, "html": self.html})
+        object.__setattr__(self, "data", payload)
+
+    def sse(self) -> str:
+        # json.dumps escapes newlines, so the payload fits one data: line
+        return f"event: {self.kind}\ndata: {self.data}\n\n"
+
+# Sent to a subscriber that fell behind, right before it is dropped;
+# the client reloads the page instead of showing a feed with gaps
+RESET = LiveEvent("reset")
+
+class Subscriber:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: asyncio.Queue[LiveEvent] = asyncio.Queue(queue_size)
+
+class LiveHub:
+    """In-process fan-out of feed changes to /live/stream clients.
+
+    Publishers never wait: each subscriber has a bounded queue and one
+    that is full gets evicted. Only used from the event loop. With
+    several workers each one only sees the writes it handled itself.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[Subscriber] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: LiveEvent) -> None:
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: Subscriber) -> None:
+        logger.info("Dropping slow live stream subscriber")
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(RESET)
+
+    async def listen(self, heartbeat: float) -> AsyncIterator[LiveEvent | None]:
+        """Yield events for one client, and None every ``heartbeat`` idle seconds."""
+        subscriber = self.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event is RESET:
+                    return
+        finally:
+            self.unsubscribe(subscriber)
+
+live_hub = LiveHub(settings.live_queue_size)
+
+def _render_entry(entry: LiveEntry) -> str:
+    view = LiveEntryView.from_model(entry)
+    return templates.get_template("_live_entry.html").render(entry=view, live_admin=False)
+
+def publish_entry(kind: str, entry: LiveEntry) -> None:
+    """Broadcast a created or updated entry, rendered once for everyone."""
+    if len(live_hub):
+        live_hub.publish(LiveEvent(kind, entry.id, _render_entry(entry)))
+
+def publish_delete(entry_id: int) -> None:
+    if len(live_hub):
+        live_hub.publish(LiveEvent("delete", entry_id))
@@ -0,0 +1,76 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+import markdown2
+from app.config import settings
+
+# Delimiters the KaTeX auto-render in _katex.html looks for. Code is
+# skipped, so shell variables like $HOME do not count as math.
+_CODE = re.compile(r"<(pre|code)\b.*?</\1>", re.S)
+_MATH = re.compile(r"\$\$.+?\$\$|(?<![\\$\w])\$(?![\s$])[^$\n]+?(?<![\s\\])\$(?![\w$])", re.S)
+
+def has_math(html: str) -> bool:
+    return _MATH.search(_CODE.sub("", html)) is not None
+
+class HighlightCache:
+    """Bounded LRU of Pygments output for fenced code blocks.
+
+    Keyed by lexer, code digest and formatter options, and shared by
+    post, page and live entry rendering, which run on several threads.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return html
+
+    def set(self, key: tuple, html: str) -> None:
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+highlight_cache = HighlightCache(settings.highlight_cache_size)
+
+class Markdown(markdown2.Markdown):
+    """markdown2 with fenced code highlighting served from highlight_cache."""
+
+    def _color_with_pygments(self, codeblock: str, lexer, **formatter_opts) -> str:
+        key = (
+            type(lexer).__qualname__,
+            tuple(sorted(lexer.options.items())),
+            hashlib.sha256(codeblock.encode()).hexdigest(),
+            repr(sorted(formatter_opts.items())),
+        )
+        html = highlight_cache.get(key)
+        if html is None:
+            html = super()._color_with_pygments(codeblock, lexer, **formatter_opts)
+            highlight_cache.set(key, html)
+        return html
+
+def markdown(text: str, extras: dict) -> str:
+    """Drop-in for markdown2.markdown() with cached highlighting."""
+    return Markdown(extras=extras).convert(text)
@@ -1,31 +1,85 @@
+import hashlib
 import os
 import yaml
-import markdown2
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from app.services import generation, render_cache
+from app.services.images import responsive_images, rewrite_image_paths, shows_image
+from app.services.markdown import has_math, markdown
 
 PAGES_DIR = "content/pages"
 
+PAGE_EXTRAS = {
+    "fenced-code-blocks": {"cssclass": "highlight"},
+    "tables": None,
+}
+
 @dataclass
 class Page:
     title: str
     content_html: str
+    has_math: bool = False
+    version: int = 0  # from generation.advance(), keys cached responses
+
+# Pages keyed by file path with the (mtime_ns, size) they were read at
+_pages: dict[str, tuple[int, int, Page]] = {}
+_generation_token = generation.token()
+
+def invalidate_page(slug: str) -> None:
+    _pages.pop(os.path.join(PAGES_DIR, f"{slug}.md"), None)
+
+def images_changed(names: set[str]) -> None:
+    """Forget the pages showing any of the images ``names``."""
+    for filepath, (_, _, page) in list(_pages.items()):
+        if shows_image(page.content_html, names):
+            del _pages[filepath]
 
 def get_page(slug: str) -> Page | None:
+    global _generation_token
+    current = generation.token()
+    if current != _generation_token:
+        _generation_token = current
+        _pages.clear()
+
     filepath = os.path.join(PAGES_DIR, f"{slug}.md")
-    if not os.path.exists(filepath):
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        _pages.pop(filepath, None)
         return None
-    
-    with open(filepath, "r", encoding="utf-8") as f:
+
+    cached = _pages.get(filepath)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    # Every load is a new snapshot of the page, with a version of its own
+    page = replace(_load_page(filepath), version=generation.advance())
+    _pages[filepath] = (st.st_mtime_ns, st.st_size, page)
+    return page
+
+def _load_page(filepath: str) -> Page:
+    with open(filepath, "rb") as f:
         raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    rendered = render_cache.get(digest, PAGE_EXTRAS)
+    if rendered is None:
+        rendered = render_page(raw.decode("utf-8"))
+        render_cache.put(digest, PAGE_EXTRAS, rendered)
+    return page_from_render(rendered)
 
+def render_page(raw: str) -> dict:
+    """Render a page source into the payload stored by the render cache."""
     _, frontmatter, body = raw.split("---", 2)
     meta = yaml.safe_load(frontmatter)
-    content_html = markdown2.markdown(
-        body,
-        extras={
-            "fenced-code-blocks": {"cssclass": "highlight"},
-            "tables": None,
-        }
-    )
+    return {
+        "meta": meta,
+        "content_html": rewrite_image_paths(markdown(body, extras=PAGE_EXTRAS)),
+    }
 
-    return Page(title=meta["title"], content_html=content_html)
+def page_from_render(rendered: dict) -> Page:
+    meta = rendered["meta"]
+    return Page(
+        title=meta["title"],
+        content_html=responsive_images(rendered["content_html"]),
+        has_math=meta.get("math", has_math(rendered["content_html"])),
+    )
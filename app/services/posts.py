@@ -1,16 +1,38 @@
+import asyncio
+import hashlib
+import logging
 import math
 import os
 import re
+import threading
 import time
 import yaml
-import markdown2
 from pygments.formatters import HtmlFormatter
-from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime
+from types import MappingProxyType
+from typing import Mapping
+from urllib.parse import quote
 from app.config import settings
+from app.services import generation, render_cache
+from app.services.images import responsive_images, rewrite_image_paths, shows_image
+from app.services.markdown import has_math, markdown
+from app.services.related import related_posts
+from app.services.search import SearchDocument, SearchIndex
 
 POSTS_DIR = "content/posts"
 
+POST_EXTRAS = {
+    "fenced-code-blocks": {"cssclass": "highlight"},
+    "code-friendly": None,
+    "tables": None,
+    "strike": None,
+    "header-ids": None,
+}
+
+logger = logging.getLogger(__name__)
+
 @dataclass
 class Post:
     title: str
@@ -23,28 +45,143 @@ class Post:
     series: str | None = None
     series_title: str | None = None
     series_part: int | None = None
+    has_math: bool = False  # only these pages load KaTeX
+
+@dataclass(frozen=True)
+class PostPage:
+    """One page of a post listing, sliced when the index is built."""
+    posts: tuple[Post, ...]
+    number: int  # 1-based
+    count: int  # pages in the listing
+
+    @property
+    def has_newer(self) -> bool:
+        return self.number > 1
+
+    @property
+    def has_older(self) -> bool:
+        return self.number < self.count
+
+def paginate(posts: tuple[Post, ...], per_page: int) -> tuple[PostPage, ...]:
+    """Split a listing into pages; an empty listing still has one, empty page."""
+    count = max(math.ceil(len(posts) / per_page), 1)
+    return tuple(
+        PostPage(posts[i * per_page:(i + 1) * per_page], i + 1, count)
+        for i in range(count)
+    )
+
+def listing_url(number: int, tag: str | None = None) -> str:
+    """Canonical URL of a listing page; page 1 has no suffix."""
+    base = f"/tag/{quote(tag, safe='')}" if tag is not None else "/"
+    if number == 1:
+        return base
+    return f"{base}/page/{number}" if tag is not None else f"/?page={number}"
+
+@dataclass
+class _SourceFile:
+    """A parsed post file together with the stat/hash it was parsed from."""
+    mtime_ns: int
+    size: int
+    digest: str
+    post: Post
+    document: SearchDocument
+
+@dataclass(frozen=True)
+class PostIndex:
+    """Immutable snapshot of all posts with precomputed lookups.
 
-_cache: list[Post] = []
-_cache_ts: float = 0.0
+    Built once per content load and swapped in as a whole, so a request
+    that grabs the index sees one consistent version of the blog.
+    """
+    posts: tuple[Post, ...]
+    by_slug: Mapping[str, Post]
+    by_tag: Mapping[str, tuple[Post, ...]]
+    by_series: Mapping[str, tuple[Post, ...]]
+    tags: tuple[str, ...]
+    search: SearchIndex
+    pages: tuple[PostPage, ...]
+    tag_pages: Mapping[str, tuple[PostPage, ...]]
+    related: Mapping[str, tuple[Post, ...]]
+    loaded_at: float = 0.0
+    version: int = 0  # from generation.advance(), keys cached responses
+
+    @classmethod
+    def build(cls, posts: list[Post], loaded_at: float = 0.0,
+              documents: Mapping[str, SearchDocument] | None = None) -> "PostIndex":
+        ordered = tuple(sorted(posts, key=lambda p: p.date, reverse=True))
+
+        by_tag: dict[str, list[Post]] = {}
+        by_series: dict[str, list[Post]] = {}
+        for post in ordered:
+            for tag in post.tags:
+                by_tag.setdefault(tag, []).append(post)
+            if post.series:
+                by_series.setdefault(post.series, []).append(post)
+
+        search = SearchIndex.build(ordered, documents)
+        return cls(
+            posts=ordered,
+            by_slug=MappingProxyType({p.slug: p for p in ordered}),
+            by_tag=MappingProxyType({t: tuple(ps) for t, ps in by_tag.items()}),
+            by_series=MappingProxyType({
+                s: tuple(sorted(ps, key=lambda p: p.series_part or 0))
+                for s, ps in by_series.items()
+            }),
+            tags=tuple(sorted(by_tag)),
+            search=search,
+            pages=paginate(ordered, PAGE_SIZE),
+            tag_pages=MappingProxyType({
+                t: paginate(tuple(ps), PAGE_SIZE) for t, ps in by_tag.items()
+            }),
+            related=related_posts(ordered, search.documents),
+            loaded_at=loaded_at,
+        )
+
+    def page(self, number: int, tag: str | None = None) -> PostPage | None:
+        """Page ``number`` of the whole archive or of one tag, None past the end."""
+        pages = self.tag_pages.get(tag, ()) if tag is not None else self.pages
+        return pages[number - 1] if 1 <= number <= len(pages) else None
+
+_index: PostIndex | None = None
 _CACHE_TTL = settings.cache_ttl
+PAGE_SIZE = settings.posts_per_page
+
+# Parsed posts keyed by file path, kept across reloads so that only
+# added or changed files go through YAML + markdown again.
+_sources: dict[str, _SourceFile] = {}
 
-def _rewrite_image_paths(html: str) -> str:
-    def replace(match):
-        src = match.group(1)
-        if src.startswith(("http://", "https://", "/", "data:")):
-            return match.group(0)
-        src = src.lstrip("./")
-        src = os.path.basename(src)
-        return f'src="/images/{src}"'
-    return re.sub(r'src="([^"]*)"', replace, html)
+# Images changed since the last reload; posts showing them are re-read
+_stale_images: set[str] = set()
 
-def _is_cache_valid() -> bool:
-    return bool(_cache) and (time.time() - _cache_ts) < _CACHE_TTL
+# All reloads run on this single thread: the event loop never parses
+# markdown itself and at most one reload is in flight at any time.
+_reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="posts-reload")
+_reload_lock = threading.Lock()
+_reload_future: Future | None = None
+# Bumped by invalidate_cache() so a reload that started before the
+# invalidation does not publish its (possibly outdated) result.
+_invalidations = 0
+# Set while app.services.watcher keeps the index fresh, in which case
+# the TTL no longer applies.
+_watched = False
+# Shared generation this process last synced with, see app.services.generation
+_generation_token = generation.token()
+
+def _is_cache_valid(index: PostIndex | None) -> bool:
+    if index is None:
+        return False
+    return _watched or (time.time() - index.loaded_at) < _CACHE_TTL
+
+def set_watched(watched: bool) -> None:
+    global _watched
+    _watched = watched
 
 def invalidate_cache() -> None:
-    global _cache, _cache_ts
-    _cache = []
-    _cache_ts = 0.0
+    global _index, _reload_future, _invalidations
+    with _reload_lock:
+        _invalidations += 1
+        _index = None
+        _reload_future = None
 
 def _parse_date(value) -> date:
     if isinstance(value, date):
@@ -57,69 +194,195 @@ def _parse_date(value) -> date:
             continue
     raise ValueError(f"Cannot parse date: {value}")
 
-def _parse_post(filepath: str) -> Post:
-    with open(filepath, "r", encoding="utf-8") as f:
-        raw = f.read()
-
+def render_post(raw: str) -> dict:
+    """Render a post source into the payload stored by the render cache."""
     _, frontmatter, body = raw.split("---", 2)
 
     meta = yaml.safe_load(frontmatter)
-    content_html = markdown2.markdown(
-        body,
-        extras={
-            "fenced-code-blocks": {"cssclass": "highlight"},
-            "code-friendly": None,
-            "tables": None,
-            "strike": None,
-            "header-ids": None,
-        }
-    )
-    content_html = _rewrite_image_paths(content_html)
+    content_html = markdown(body, extras=POST_EXTRAS)
+    content_html = rewrite_image_paths(content_html)
 
+    return {
+        "meta": meta,
+        "content_html": content_html,
+        "reading_time": reading_time(content_html),
+    }
+
+def _parse_post_text(raw: str, digest: str | None = None) -> Post:
+    """Build a Post, reusing the persistent render cache when a digest is given."""
+    rendered = render_cache.get(digest, POST_EXTRAS) if digest else None
+    if rendered is None:
+        rendered = render_post(raw)
+        if digest:
+            render_cache.put(digest, POST_EXTRAS, rendered)
+    return post_from_render(rendered)
+
+def post_from_render(rendered: dict) -> Post:
+    meta = rendered["meta"]
+    # Image sizes are read here rather than cached with the render; posts
+    # showing a changed image are reloaded through images_changed()
+    content_html = responsive_images(rendered["content_html"])
     return Post(
         title=meta["title"],
         date=_parse_date(meta["date"]),
         slug=meta["slug"],
         summary=meta.get("summary", ""),
-        tags=meta.get("tags", []),
+        # A slash would end the tag in /tag/{tag} URLs, even when escaped
+        tags=[str(tag).replace("/", "-") for tag in meta.get("tags", [])],
         content_html=content_html,
-        reading_time=reading_time(content_html),
+        reading_time=rendered["reading_time"],
         series=meta.get("series"),
         series_title=meta.get("series_title"),
         series_part=meta.get("series_part"),
+        # Front matter `math: true/false` overrides detection
+        has_math=meta.get("math", has_math(rendered["content_html"])),
     )
 
+def _load_source(filepath: str, known: _SourceFile | None) -> _SourceFile:
+    st = os.stat(filepath)
+    if known and known.mtime_ns == st.st_mtime_ns and known.size == st.st_size:
+        return known
+
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    # Touched but identical (git checkout, rsync, ...) - keep the parsed post
+    if known and known.digest == digest:
+        return replace(known, mtime_ns=st.st_mtime_ns, size=st.st_size)
+    post = _parse_post_text(raw.decode("utf-8"), digest)
+    return _SourceFile(st.st_mtime_ns, st.st_size, digest, post, SearchDocument.from_post(post))
+
 def _load_all_posts() -> list[Post]:
-    posts = []
+    """Scan POSTS_DIR, re-parsing only files that were added or changed.
+
+    Removed files simply drop out of the new source table.
+    """
+    global _sources
+
+    with _reload_lock:
+        stale = _stale_images.copy()
+        _stale_images.clear()
+
+    sources = {}
     for filename in os.listdir(POSTS_DIR):
         if filename.endswith(".md"):
             filepath = os.path.join(POSTS_DIR, filename)
-            posts.append(_parse_post(filepath))
-    return sorted(posts, key=lambda p: p.date, reverse=True)
+            known = _sources.get(filepath)
+            if known and stale and shows_image(known.post.content_html, stale):
+                known = None  # the render is cached, only image sizes are read again
+            sources[filepath] = _load_source(filepath, known)
+    _sources = sources
+
+    return [source.post for source in sources.values()]
 
 def reading_time(content_html: str) -> int:
     text = re.sub(r'<[^>]+>', '', content_html)
     words = len(text.split())
     return max(1, math.ceil(words / 200))
 
-def get_all_posts(tag: str | None = None) -> list[Post]:
-    global _cache, _cache_ts
+def _reload(invalidations: int) -> PostIndex:
+    global _index
+
+    posts = _load_all_posts()
+    previous = _index
+    changed = previous is None or _posts_changed(previous.posts, posts)
+    if changed:
+        # Search documents are kept per file, so only changed posts are re-tokenized
+        documents = {source.post.slug: source.document for source in _sources.values()}
+        index = PostIndex.build(posts, loaded_at=time.time(), documents=documents)
+    else:
+        # Nothing on disk changed: keep the snapshot so caches keyed on
+        # the content version stay warm
+        index = replace(previous, loaded_at=time.time())
+
+    if changed:
+        # Stamped before publishing, so a response is always cached under
+        # the version of the snapshot it was rendered from
+        index = replace(index, version=generation.advance())
+    with _reload_lock:
+        if invalidations != _invalidations:
+            return index
+        _index = index
+    return index
+
+def _posts_changed(current: tuple[Post, ...], loaded: list[Post]) -> bool:
+    if len(current) != len(loaded):
+        return True
+    ids = {id(post) for post in current}
+    return any(id(post) not in ids for post in loaded)
+
+def _log_reload_error(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Reloading posts failed", exc_info=future.exception())
+
+def _schedule_reload(force: bool = False) -> Future:
+    """Start a reload unless one is already running, and return its future.
+
+    With ``force`` a new reload is queued behind the running one, for
+    callers that know the running one may have missed a change.
+    """
+    global _reload_future
+    with _reload_lock:
+        if force or _reload_future is None or _reload_future.done():
+            _reload_future = _reload_executor.submit(_reload, _invalidations)
+            _reload_future.add_done_callback(_log_reload_error)
+        return _reload_future
+
+def refresh() -> None:
+    """Reload in the background, keeping the current index until it is done."""
+    _schedule_reload(force=True)
+
+def images_changed(names: set[str]) -> None:
+    """Reload the posts showing any of the images ``names`` in the background."""
+    with _reload_lock:
+        _stale_images.update(names)
+    refresh()
+
+def _sync_generation() -> None:
+    """Drop the index if another worker announced a content change."""
+    global _generation_token
+    current = generation.token()
+    if current != _generation_token:
+        _generation_token = current
+        invalidate_cache()
+
+def get_post_index() -> PostIndex:
+    """Blocking variant for code that is not running on the event loop."""
+    _sync_generation()
+    index = _index
+    if _is_cache_valid(index):
+        return index
+    return _schedule_reload().result()
+
+async def get_post_index_async() -> PostIndex:
+    """Return the current index without blocking the event loop.
 
-    if not _is_cache_valid():
-        _cache = _load_all_posts()
-        _cache_ts = time.time()
+    An expired index is served as-is while a background reload refreshes
+    it (stale-while-revalidate); callers only wait when there is nothing
+    to serve yet, and then they all share the same reload.
+    """
+    _sync_generation()
+    index = _index
+    if _is_cache_valid(index):
+        return index
+    future = _schedule_reload()
+    if index is not None:
+        return index
+    return await asyncio.wrap_future(future)
 
+def get_all_posts(tag: str | None = None) -> tuple[Post, ...]:
+    index = get_post_index()
     if tag:
-        return [p for p in _cache if tag in p.tags]
-    return _cache
+        return index.by_tag.get(tag, ())
+    return index.posts
 
 def get_post_by_slug(slug: str) -> Post | None:
-    return next((p for p in get_all_posts() if p.slug == slug), None)
+    return get_post_index().by_slug.get(slug)
 
-def get_all_tags() -> list[str]:
-    return sorted(set(tag for post in get_all_posts() for tag in post.tags))
+def get_all_tags() -> tuple[str, ...]:
+    return get_post_index().tags
 
-def get_series_posts(series: str) -> list[Post]:
+def get_series_posts(series: str) -> tuple[Post, ...]:
     """Return all posts in a series, sorted by part number."""
-    posts = [p for p in get_all_posts() if p.series == series]
-    return sorted(posts, key=lambda p: p.series_part or 0)
+    return get_post_index().by_series.get(series, ())
@@ -0,0 +1,137 @@
+import threading
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
+import numpy as np
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.services.posts import Post
+    from app.services.search import SearchDocument
+
+RELATED_COUNT = settings.related_posts
+# Below this cosine similarity a post is not worth recommending
+MIN_SIMILARITY = 0.05
+# Vocabulary cap; keeps the matrix small for a few thousand posts
+MAX_FEATURES = 2048
+# Rows of the similarity matrix computed at a time
+BLOCK_ROWS = 512
+
+# Too common to say anything about what a post is about
+STOP_WORDS = frozenset("""
+a about after all also an and any are as at be because been but by can could
+do does did for from had has have how i if in into is it its just like may me
+more most my no not now of on one only or other our out over so some such than
+that the their them then there these they this to too up us use used using very
+was we were what when where which while who why will with would you your
+""".split())
+
+# Every term gets a stable id, so that per-post vectors stay valid from
+# one content load to the next; renumbered by _compact() once terms of
+# removed or edited posts make up most of it
+_term_ids: dict[str, int] = {}
+# Term vectors keyed by id() of their search document; documents of
+# unchanged posts are reused across reloads, and so are their vectors
+_vectors: dict[int, tuple["SearchDocument", np.ndarray, np.ndarray]] = {}
+_lock = threading.Lock()
+
+def _vector(doc: "SearchDocument") -> tuple[np.ndarray, np.ndarray]:
+    """Term ids and sublinear term frequencies of one document."""
+    cached = _vectors.get(id(doc))
+    if cached is not None and cached[0] is doc:
+        return cached[1], cached[2]
+    terms = [(term, f) for term, f in doc.terms.items() if term not in STOP_WORDS]
+    ids = np.fromiter(
+        (_term_ids.setdefault(term, len(_term_ids)) for term, _ in terms),
+        dtype=np.intp, count=len(terms),
+    )
+    tf = 1 + np.log(np.fromiter((f for _, f in terms), dtype=np.float32, count=len(terms)))
+    _vectors[id(doc)] = (doc, ids, tf)
+    return ids, tf
+
+def _compact() -> None:
+    """Drop the terms no cached vector uses and renumber the rest."""
+    global _term_ids
+    used = np.unique(np.concatenate([v[1] for v in _vectors.values()] or [np.empty(0, np.intp)]))
+    if len(_term_ids) <= 2 * len(used):
+        return
+    remap = np.full(len(_term_ids), -1, dtype=np.intp)
+    remap[used] = np.arange(len(used))
+    # Ids are handed out in insertion order, so the new ones are as well
+    _term_ids = {term: int(remap[i]) for term, i in _term_ids.items() if remap[i] >= 0}
+    for key, (doc, ids, tf) in _vectors.items():
+        _vectors[key] = (doc, remap[ids], tf)
+
+def _tfidf(documents: tuple["SearchDocument", ...]) -> np.ndarray:
+    """L2-normalised TF-IDF rows, one per document, over a capped vocabulary.
+
+    Terms in a single post cannot relate two posts and terms in every
+    post have no IDF weight, so neither makes it into the matrix; of the
+    rest the MAX_FEATURES with the highest df·idf are kept.
+    """
+    n = len(documents)
+    with _lock:
+        vectors = [_vector(doc) for doc in documents]
+        # Forget documents that are gone, their posts changed or were removed
+        live = {id(doc) for doc in documents}
+        for key in [key for key in _vectors if key not in live]:
+            del _vectors[key]
+        _compact()
+        vectors = [_vector(doc) for doc in documents]
+        vocabulary_size = len(_term_ids)
+
+    ids = np.concatenate([v[0] for v in vectors])
+    tf = np.concatenate([v[1] for v in vectors])
+    rows = np.repeat(np.arange(n), [len(v[0]) for v in vectors])
+
+    df = np.bincount(ids, minlength=vocabulary_size)
+    idf = np.log(n / np.maximum(df, 1))
+    score = np.where((df >= 2) & (df < n), df * idf, 0.0)
+    features = np.flatnonzero(score)
+    if len(features) > MAX_FEATURES:
+        features = features[np.argpartition(-score[features], MAX_FEATURES - 1)[:MAX_FEATURES]]
+
+    columns = np.full(vocabulary_size, -1, dtype=np.intp)
+    columns[features] = np.arange(len(features))
+    entry_columns = columns[ids]
+    kept = entry_columns >= 0
+
+    matrix = np.zeros((n, len(features)), dtype=np.float32)
+    matrix[rows[kept], entry_columns[kept]] = tf[kept] * idf[ids[kept]]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def related_posts(posts: tuple["Post", ...], documents: tuple["SearchDocument", ...],
+                  count: int = RELATED_COUNT) -> Mapping[str, tuple["Post", ...]]:
+    """Up to ``count`` most similar posts per slug, by cosine of TF-IDF vectors.
+
+    ``documents`` are the search documents of ``posts``, in the same order,
+    so text and tags are not tokenized a second time. Posts of the same
+    series are skipped, post.html already links to them.
+    """
+    n = len(posts)
+    count = min(count, n - 1)
+    if count <= 0:
+        return MappingProxyType({})
+
+    matrix = _tfidf(documents)
+    series_ids = {s: i for i, s in enumerate({p.series for p in posts if p.series})}
+    series = np.array([series_ids.get(p.series, -1) for p in posts])
+
+    related: dict[str, tuple["Post", ...]] = {}
+    for start in range(0, n, BLOCK_ROWS):
+        block = slice(start, min(start + BLOCK_ROWS, n))
+        scores = matrix[block] @ matrix.T
+        rows = np.arange(scores.shape[0])
+        scores[rows, rows + start] = -1.0
+        scores[(series[block, None] == series[None, :]) & (series[block, None] >= 0)] = -1.0
+
+        top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        for row in rows:
+            # Best first; ties go to the newer post, which comes first in posts
+            order = np.lexsort((top[row], -top_scores[row]))
+            related[posts[start + row].slug] = tuple(
+                posts[top[row, i]] for i in order if top_scores[row, i] >= MIN_SIMILARITY
+            )
+    return MappingProxyType(related)
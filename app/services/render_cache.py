@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+import markdown2
+import pygments
+from app.config import settings
+
+# Bump whenever the post-processing around markdown2 changes
+# (image rewriting, reading time, ...) so old entries stop matching.
+RENDERER_VERSION = 2
+
+CACHE_PATH = settings.render_cache_path
+
+# Entries baked in by `python -m app.build`, consulted before CACHE_PATH
+_prebuilt: dict[str, dict] = {}
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rendered (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+)
+"""
+
+def _config(extras: dict, renderer_version: int = RENDERER_VERSION) -> str:
+    return json.dumps(
+        [extras, renderer_version, markdown2.__version__, pygments.__version__],
+        sort_keys=True,
+    )
+
+def key(digest: str, extras: dict) -> str:
+    return hashlib.sha256(f"{digest}:{_config(extras)}".encode()).hexdigest()
+
+def fingerprint(extras: dict, renderer_version: int) -> str:
+    """Identify a renderer configuration, for HTML stored elsewhere.
+
+    Callers pass their own version: RENDERER_VERSION only covers the
+    post-processing of posts and pages.
+    """
+    return hashlib.sha256(_config(extras, renderer_version).encode()).hexdigest()[:16]
+
+def _json_default(value):
+    # YAML front matter may contain dates; store them in a form _parse_date reads back
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _connect() -> sqlite3.Connection:
+    directory = os.path.dirname(CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=5)
+    conn.execute(_SCHEMA)
+    return conn
+
+def dumps(payload) -> str:
+    return json.dumps(payload, default=_json_default, separators=(",", ":"))
+
+def load_artifact(path: str) -> int:
+    """Load prebuilt renders written by app.build; returns the entry count."""
+    global _prebuilt
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            _prebuilt = json.load(f)
+    except FileNotFoundError:
+        return 0
+    return len(_prebuilt)
+
+def get(digest: str, extras: dict) -> dict | None:
+    """Return the stored render for a source digest, or None on a miss."""
+    entry_key = key(digest, extras)
+    prebuilt = _prebuilt.get(entry_key)
+    if prebuilt is not None:
+        return prebuilt
+    if not CACHE_PATH:
+        return None
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT payload FROM rendered WHERE key = ?", (entry_key,)
+            ).fetchone()
+    except sqlite3.Error:
+        logger.warning("Render cache unavailable at %s", CACHE_PATH, exc_info=True)
+        return None
+    return json.loads(row[0]) if row else None
+
+def put(digest: str, extras: dict, payload: dict) -> None:
+    if not CACHE_PATH:
+        return
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rendered (key, payload) VALUES (?, ?)",
+                (key(digest, extras), dumps(payload)),
+            )
+    except sqlite3.Error:
+        logger.warning("Render cache unavailable at %s", CACHE_PATH, exc_info=True)
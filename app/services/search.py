@@ -0,0 +1,161 @@
+import heapq
+import html
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
+
+if TYPE_CHECKING:
+    from app.services.posts import Post
+
+_TOKEN = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+# A title or tag hit counts three body words, a summary hit two
+FIELD_WEIGHTS = {"title": 3.0, "tags": 3.0, "summary": 2.0, "body": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_CHARS = 200
+MAX_QUERY_TERMS = 8
+
+# Databases wrap matches in these; mark_snippet() turns them into <mark>
+MATCH_START = "\x02"
+MATCH_STOP = "\x03"
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.casefold())
+
+def query_terms(query: str) -> list[str]:
+    """Distinct terms of a user query, in order, capped at MAX_QUERY_TERMS."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+def mark_snippet(raw: str) -> str:
+    """Escape a database snippet and turn its match markers into <mark>."""
+    return html.escape(raw).replace(MATCH_START, "<mark>").replace(MATCH_STOP, "</mark>")
+
+def match_snippet(text: str, terms: list[str]) -> str:
+    """Cut a snippet around the first match, marked up like a database one."""
+    pattern = re.compile("|".join(map(re.escape, terms)), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(match.start() - SNIPPET_CHARS // 4, 0) if match else 0
+    end = min(start + SNIPPET_CHARS, len(text))
+    window = pattern.sub(lambda m: MATCH_START + m.group() + MATCH_STOP, text[start:end])
+    return ("…" if start else "") + window + ("…" if end < len(text) else "")
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """What the index needs from one post; built once per parsed file."""
+    text: str  # content_html stripped to plain text, for snippets
+    terms: Mapping[str, float]  # field-weighted term frequencies
+    length: float
+
+    @classmethod
+    def from_post(cls, post: "Post") -> "SearchDocument":
+        text = _SPACE.sub(" ", html.unescape(_TAG.sub(" ", post.content_html))).strip()
+        fields = {
+            "title": post.title,
+            "tags": " ".join(post.tags),
+            "summary": post.summary,
+            "body": text,
+        }
+        terms: dict[str, float] = {}
+        for name, value in fields.items():
+            weight = FIELD_WEIGHTS[name]
+            for term, count in Counter(tokenize(value)).items():
+                terms[term] = terms.get(term, 0.0) + count * weight
+        return cls(text=text, terms=MappingProxyType(terms), length=sum(terms.values()))
+
+@dataclass(frozen=True)
+class SearchHit:
+    post: "Post"
+    score: float
+    snippet: str  # HTML, matches wrapped in <mark>
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """Inverted index over posts, ranked with BM25.
+
+    Queries only touch the postings of their own terms, never the
+    post bodies, except to cut a snippet for the hits returned.
+    """
+    posts: tuple["Post", ...]
+    documents: tuple[SearchDocument, ...]
+    postings: Mapping[str, tuple[tuple[int, float], ...]]
+    avg_length: float
+
+    @classmethod
+    def build(cls, posts: tuple["Post", ...],
+              documents: Mapping[str, SearchDocument] | None = None) -> "SearchIndex":
+        """``documents`` maps slugs to already built documents to reuse."""
+        documents = documents or {}
+        docs = tuple(documents.get(p.slug) or SearchDocument.from_post(p) for p in posts)
+
+        postings: defaultdict[str, list[tuple[int, float]]] = defaultdict(list)
+        for position, doc in enumerate(docs):
+            for term, frequency in doc.terms.items():
+                postings[term].append((position, frequency))
+
+        total = sum(doc.length for doc in docs)
+        return cls(
+            posts=posts,
+            documents=docs,
+            postings=MappingProxyType({t: tuple(p) for t, p in postings.items()}),
+            avg_length=total / len(docs) if docs else 0.0,
+        )
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Posts containing every query term, best first."""
+        terms = query_terms(query)
+        lists = [self.postings.get(term) for term in terms]
+        if not terms or not all(lists):
+            return []
+
+        count = len(self.posts)
+        scores: dict[int, float] | None = None
+        # Rarest term first keeps the candidate set small
+        for postings in sorted(lists, key=len):
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            matched = {}
+            for position, frequency in postings:
+                if scores is not None and position not in scores:
+                    continue
+                norm = 1 - BM25_B + BM25_B * self.documents[position].length / self.avg_length
+                gain = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                matched[position] = (scores[position] if scores is not None else 0.0) + gain
+            scores = matched
+
+        # Ties go to the newer post, which comes first in self.posts
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            SearchHit(self.posts[position], score, self._snippet(position, terms))
+            for position, score in best
+        ]
+
+    def _snippet(self, position: int, terms: list[str]) -> str:
+        pattern = re.compile(r"\b(" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE)
+        text = self.documents[position].text
+        match = pattern.search(text)
+        if not match:
+            # Matched on the title or tags only
+            text = self.posts[position].summary or text
+            match = pattern.search(text)
+
+        start = max(match.start() - SNIPPET_CHARS // 4, 0) if match else 0
+        if start:
+            start = text.find(" ", start) + 1 or start
+        end = min(start + SNIPPET_CHARS, len(text))
+        if end < len(text):
+            end = text.rfind(" ", start, end) if " " in text[start:end] else end
+
+        # Mark matches in the raw text; escaping first could split entities
+        pieces = []
+        last = start
+        for m in pattern.finditer(text, start, end):
+            pieces += [html.escape(text[last:m.start()]), "<mark>", html.escape(m.group()), "</mark>"]
+            last = m.end()
+        pieces.append(html.escape(text[last:end]))
+        return ("…" if start else "") + "".join(pieces) + ("…" if end < len(text) else "")
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.repositories.post_stat import PostStatRepository, hour_bucket
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """Buffers post views in memory and writes them out in batches.
+
+    Views are counted per (slug, hour) so a flush can feed the hourly
+    and daily rollups as well as the totals. They are only ever touched
+    from the event loop, so swapping the buffer in flush() needs no lock.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Counter[tuple[str, datetime]] = Counter()
+        self._totals: Counter[str] = Counter()
+        # Per-slug views taken out by a flush that has not committed yet
+        self._flushing: Counter[str] = Counter()
+
+    def record(self, slug: str) -> None:
+        self._pending[(slug, hour_bucket(datetime.now(timezone.utc)))] += 1
+        self._totals[slug] += 1
+
+    def pending(self, slug: str) -> int:
+        return self._totals.get(slug, 0) + self._flushing.get(slug, 0)
+
+    def clear(self) -> None:
+        self._pending = Counter()
+        self._totals = Counter()
+        self._flushing = Counter()
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Persist buffered views in one transaction; returns views written."""
+        counts, self._pending = self._pending, Counter()
+        totals, self._totals = self._totals, Counter()
+        if not counts:
+            return 0
+        self._flushing = totals
+        try:
+            await PostStatRepository(db).add_views(dict(counts))
+        except Exception:
+            # Put the views back so the next flush retries them
+            self._pending.update(counts)
+            self._totals.update(totals)
+            raise
+        finally:
+            self._flushing = Counter()
+        return sum(counts.values())
+
+view_counter = ViewCounter()
+
+async def run_flusher(
+    session_factory: async_sessionmaker,
+    stop_event: asyncio.Event,
+    interval: float,
+) -> None:
+    """Flush view_counter every ``interval`` seconds, and once more on stop."""
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            async with session_factory() as db:
+                await view_counter.flush(db)
+        except Exception:
+            logger.exception("Flushing post views failed")
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import os
+from watchfiles import Change, awatch
+from app.services import images, pages, posts
+
+logger = logging.getLogger(__name__)
+
+def _apply(changes: set[tuple[Change, str]]) -> None:
+    posts_dir = os.path.abspath(posts.POSTS_DIR)
+    pages_dir = os.path.abspath(pages.PAGES_DIR)
+    images_dir = os.path.abspath(images.IMAGES_DIR)
+
+    posts_changed = False
+    changed_images = set()
+    for _, path in changes:
+        directory, filename = os.path.split(os.path.abspath(path))
+        if directory == images_dir:
+            changed_images.add(filename)
+            continue
+        if not filename.endswith(".md"):
+            continue
+        if directory == posts_dir:
+            posts_changed = True
+        elif directory == pages_dir:
+            pages.invalidate_page(filename[:-3])
+
+    # Sizes and srcsets of a replaced image are baked into the HTML
+    if changed_images:
+        pages.images_changed(changed_images)
+        posts.images_changed(changed_images)  # reloads changed posts too
+    # The incremental reload only re-parses the files that actually changed
+    elif posts_changed:
+        posts.refresh()
+
+async def watch_content(stop_event: asyncio.Event) -> None:
+    """Keep posts and pages fresh from filesystem events until stop_event is set.
+
+    While this runs the posts cache ignores its TTL, so content is only
+    re-read when something on disk changes.
+    """
+    posts.set_watched(True)
+    try:
+        async for changes in awatch(
+            posts.POSTS_DIR, pages.PAGES_DIR, images.IMAGES_DIR, stop_event=stop_event, step=100
+        ):
+            _apply(changes)
+    except Exception:
+        logger.exception("Content watcher stopped, falling back to TTL expiry")
+    finally:
+        posts.set_watched(False)
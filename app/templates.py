@@ -1,3 +1,53 @@
+import logging
+import os
+import time
+import jinja2
 from fastapi.templating import Jinja2Templates
+from app.config import settings
+from app.services.assets import stylesheets
+from app.services.posts import listing_url
 
-templates = Jinja2Templates(directory="app/templates")
+TEMPLATES_DIR = "app/templates"
+
+logger = logging.getLogger(__name__)
+
+class _BytecodeCache(jinja2.FileSystemBytecodeCache):
+    """Creates its directory on the first write rather than at import."""
+
+    def dump_bytecode(self, bucket: jinja2.bccache.Bucket) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+def make_environment(production: bool, bytecode_dir: str = "") -> jinja2.Environment:
+    """Development re-checks template mtimes on every render; production
+    never does, and shares compiled bytecode through ``bytecode_dir``."""
+    bytecode_cache = None
+    if production and bytecode_dir:
+        bytecode_cache = _BytecodeCache(bytecode_dir)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=not production,
+        bytecode_cache=bytecode_cache,
+    )
+
+templates = Jinja2Templates(env=make_environment(
+    production=settings.app_env != "development",
+    bytecode_dir=settings.template_bytecode_dir,
+))
+templates.env.globals["stylesheets"] = stylesheets
+templates.env.globals["listing_url"] = listing_url
+# Canonical and og:url links are built from this, never from request.url:
+# a cached page would repeat the first visitor's host and query string
+templates.env.globals["site_url"] = settings.site_url.rstrip("/")
+
+def precompile(env: jinja2.Environment | None = None) -> int:
+    """Load every template so no request pays for compiling one."""
+    env = env or templates.env
+    started = time.perf_counter()
+    names = env.list_templates(extensions=["html", "xml", "txt"])
+    for name in names:
+        env.get_template(name)
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info("Compiled %d templates in %.1f ms", len(names), elapsed)
+    return len(names)
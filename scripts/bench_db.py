@@ -0,0 +1,76 @@
+"""Concurrent read/write throughput of the default vs the tuned engine.
+
+    python scripts/bench_db.py [--seconds 5] [--readers 8] [--writers 4] [--url ...]
+
+Writers flush post views the way the view counter does, readers fetch
+post stats the way post_detail does. Without --url a throwaway SQLite
+file is used for each run.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from app.database.base import Base  # noqa: E402
+from app.database.engine import make_engine  # noqa: E402
+from app.database.models import post_stat, post_view_rollup  # noqa: E402,F401
+from app.repositories.post_stat import PostStatRepository, hour_bucket  # noqa: E402
+
+SLUGS = [f"post-{i}" for i in range(50)]
+
+async def _worker(sessions, stop: float, write: bool, counts: dict) -> None:
+    i = 0
+    while time.perf_counter() < stop:
+        slug = SLUGS[i % len(SLUGS)]
+        i += 1
+        try:
+            async with sessions() as db:
+                repo = PostStatRepository(db)
+                if write:
+                    hour = hour_bucket(datetime.now(timezone.utc))
+                    await repo.add_views({(slug, hour): 1})
+                else:
+                    await repo.get_by_slug(slug)
+            counts["writes" if write else "reads"] += 1
+        except Exception:
+            counts["errors"] += 1
+
+async def run(label: str, engine, args) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    stop = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(_worker(sessions, stop, False, counts) for _ in range(args.readers)),
+        *(_worker(sessions, stop, True, counts) for _ in range(args.writers)),
+    )
+    await engine.dispose()
+
+    print(
+        f"{label:8} reads/s={counts['reads'] / args.seconds:9.1f} "
+        f"writes/s={counts['writes'] / args.seconds:8.1f} errors={counts['errors']}"
+    )
+
+async def main(args) -> None:
+    for label, factory in (("default", create_async_engine), ("tuned", make_engine)):
+        if args.url:
+            await run(label, factory(args.url), args)
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            await run(label, factory(f"sqlite+aiosqlite:///{tmp}/bench.db"), args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--url", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -11,6 +11,10 @@ echo ">>> Running migrations"
 docker compose -f docker-compose.prod.yml run --rm app \
   alembic upgrade head
 
+echo ">>> Rendering live entries"
+docker compose -f docker-compose.prod.yml run --rm app \
+  python -m app.backfill
+
 echo ">>> Restarting services"
 docker compose -f docker-compose.prod.yml up -d
 
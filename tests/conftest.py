@@ -3,9 +3,13 @@ import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.main import app
+from app.config import settings
 from app.database.engine import get_db
 from app.database.base import Base
-from app.database.models import post_stat, live_entry  # noqa: F401
+from app.database.models import post_stat, post_view_rollup, live_entry  # noqa: F401
+from app.http_cache import page_cache
+from app.repositories.live_entry import reset_count_cache
+from app.services.view_counter import view_counter
 
 # ── Test database ────────────────────────────────────────
 # Separate in-memory SQLite database for tests
@@ -21,6 +25,41 @@ TestSessionLocal = async_sessionmaker(
 
 # ── Fixtures ─────────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def render_cache_path(monkeypatch, tmp_path):
+    """Keep the persistent render cache inside the test's temp dir."""
+    path = str(tmp_path / "render_cache.sqlite3")
+    monkeypatch.setattr("app.services.render_cache.CACHE_PATH", path)
+    return path
+
+@pytest.fixture(autouse=True)
+def generation_file(monkeypatch, tmp_path):
+    """Isolate the cross-worker content generation file."""
+    path = str(tmp_path / "content-generation")
+    monkeypatch.setattr("app.services.generation.GENERATION_FILE", path)
+    return path
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    """Rendered pages must not leak between tests."""
+    page_cache.clear()
+    yield
+    page_cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_view_counter():
+    """Buffered views belong to the test that recorded them."""
+    view_counter.clear()
+    yield
+    view_counter.clear()
+
+@pytest.fixture(autouse=True)
+def clear_live_count():
+    """Every test starts with a fresh database, so recount it."""
+    reset_count_cache()
+    yield
+    reset_count_cache()
+
 @pytest_asyncio.fixture(autouse=True)
 async def setup_database():
     """Create tables before each test, drop after."""
@@ -54,3 +93,10 @@ async def client(db_session):
         yield ac
 
     app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture
+async def admin_client(client):
+    """The test client with an admin session cookie."""
+    response = await client.post("/admin/login", data={"password": settings.admin_token})
+    assert response.status_code == 303
+    return client
@@ -0,0 +1,46 @@
+import pytest
+from app import build
+from app.services import posts, render_cache
+from app.services.posts import invalidate_cache, get_all_posts
+
+POST = """---
+title: Built Post
+date: 01.01.2026
+slug: built-post
+---
+
+Body.
+"""
+
+@pytest.fixture(autouse=True)
+def content_dirs(monkeypatch, tmp_path):
+    posts_dir = tmp_path / "posts"
+    pages_dir = tmp_path / "pages"
+    posts_dir.mkdir()
+    pages_dir.mkdir()
+    monkeypatch.setattr("app.services.posts.POSTS_DIR", str(posts_dir))
+    monkeypatch.setattr("app.services.pages.PAGES_DIR", str(pages_dir))
+    monkeypatch.setattr("app.services.render_cache.CACHE_PATH", "")
+    monkeypatch.setattr("app.services.render_cache._prebuilt", {})
+    monkeypatch.setattr("app.services.posts._sources", {})
+    invalidate_cache()
+    yield posts_dir
+    invalidate_cache()
+
+def test_artifact_skips_markdown_at_runtime(content_dirs, tmp_path, monkeypatch):
+    (content_dirs / "built-post.md").write_text(POST)
+    output = str(tmp_path / "content.json")
+    assert build.main([output]) == 0
+
+    monkeypatch.setattr(
+        "app.services.posts.render_post",
+        lambda raw: pytest.fail("markdown rendered despite artifact"),
+    )
+    assert render_cache.load_artifact(output) == 1
+    assert get_all_posts()[0].title == "Built Post"
+
+def test_build_fails_on_duplicate_slug(content_dirs, tmp_path):
+    (content_dirs / "a.md").write_text(POST)
+    (content_dirs / "b.md").write_text(POST)
+
+    assert build.main([str(tmp_path / "content.json")]) == 1
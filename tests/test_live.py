@@ -0,0 +1,188 @@
+import json
+import pytest
+from datetime import datetime
+from app.config import settings
+from app.database.models.live_entry import LiveEntry
+from app.repositories.live_entry import LiveEntryRepository
+from app.schemas.live_entry import LiveEntryView
+from app.services.live import RENDER_VERSION
+from app.services.live_hub import RESET, LiveEvent, LiveHub, live_hub
+
+async def _seed(db_session, count: int, pinned: tuple[int, ...] = ()) -> None:
+    # Same timestamp for every row, so only the id breaks ties
+    stamp = datetime(2026, 3, 10, 12, 0)
+    db_session.add_all(
+        LiveEntry(body=f"entry {i}", pinned=i in pinned, created_at=stamp)
+        for i in range(count)
+    )
+    await db_session.commit()
+
+async def test_keyset_pages_cover_feed_once(db_session):
+    await _seed(db_session, 7, pinned=(2,))
+    repo = LiveEntryRepository(db_session)
+
+    seen = []
+    page = await repo.get_page(limit=3)
+    assert page.newer is None
+    while True:
+        seen += [entry.body for entry in page.entries]
+        if page.older is None:
+            break
+        page = await repo.get_page(limit=3, before=page.older)
+
+    assert seen == ["entry 2", "entry 6", "entry 5", "entry 4", "entry 3", "entry 1", "entry 0"]
+
+    # Walking back up from the last page returns the previous one
+    back = await repo.get_page(limit=3, after=page.newer)
+    assert [entry.body for entry in back.entries] == ["entry 4", "entry 3", "entry 1"]
+    assert back.newer is not None and back.older is not None
+
+async def test_count_tracks_create_and_delete(db_session):
+    repo = LiveEntryRepository(db_session)
+    assert await repo.count() == 0
+
+    entry = await repo.create("hello")
+    await repo.create("world")
+    assert await repo.count() == 2
+
+    await repo.delete(entry.id)
+    assert await repo.count() == 1
+
+async def test_live_page_links_cursors(client, db_session):
+    await _seed(db_session, 25)
+
+    response = await client.get("/live/")
+    assert response.status_code == 200
+    assert "25 entries" in response.text
+    assert "?before=" in response.text
+    assert "?after=" not in response.text
+
+async def test_live_rejects_bad_cursor(client):
+    response = await client.get("/live/?before=not-a-cursor")
+    assert response.status_code == 400
+
+async def test_create_stores_rendered_html(db_session):
+    entry = await LiveEntryRepository(db_session).create("**bold**")
+    assert entry.render_version == RENDER_VERSION
+    assert "<strong>bold</strong>" in entry.body_html
+    assert LiveEntryView.from_model(entry).body_html == entry.body_html
+
+async def test_rerender_stale_entries(db_session):
+    db_session.add_all([
+        LiveEntry(body="*new*", created_at=datetime(2026, 3, 10)),
+        LiveEntry(body="*old*", body_html="stale", render_version="0" * 16,
+                  created_at=datetime(2026, 3, 10)),
+    ])
+    await db_session.commit()
+    repo = LiveEntryRepository(db_session)
+
+    # Stale HTML is never shown, even before the backfill
+    entries = await repo.get_all()
+    assert all("<em>" in LiveEntryView.from_model(e).body_html for e in entries)
+
+    assert await repo.rerender_stale(batch_size=1) == 2
+    assert await repo.rerender_stale() == 0
+    assert all(e.render_version == RENDER_VERSION for e in await repo.get_all())
+
+async def test_hub_broadcasts_writes(db_session):
+    subscriber = live_hub.subscribe()
+    try:
+        repo = LiveEntryRepository(db_session)
+        entry = await repo.create("*hello*")
+        await repo.toggle_pin(entry.id)
+        await repo.delete(entry.id)
+
+        events = [subscriber.queue.get_nowait() for _ in range(3)]
+        assert [e.kind for e in events] == ["create", "update", "delete"]
+        assert "<em>hello</em>" in events[0].html
+        assert f'id="entry-{entry.id}"' in events[0].html
+        assert "pinned" in events[1].html
+        assert events[0].sse().startswith("event: create\ndata: {")
+    finally:
+        live_hub.unsubscribe(subscriber)
+
+async def test_hub_evicts_slow_subscriber():
+    hub = LiveHub(queue_size=2)
+    fast, slow = hub.subscribe(), hub.subscribe()
+    hub.publish(LiveEvent("delete", 1))
+    hub.publish(LiveEvent("delete", 2))
+    fast.queue.get_nowait()
+    fast.queue.get_nowait()
+    hub.publish(LiveEvent("delete", 3))
+
+    assert len(hub) == 1
+    assert slow.queue.get_nowait() is RESET
+    assert fast.queue.get_nowait().entry_id == 3
+
+async def test_hub_listen_heartbeats_and_stops_on_reset():
+    hub = LiveHub(queue_size=1)
+    stream = hub.listen(heartbeat=0.01)
+    assert await anext(stream) is None
+    assert len(hub) == 1
+
+    hub.publish(LiveEvent("delete", 1))
+    hub.publish(LiveEvent("delete", 2))
+    assert await anext(stream) is RESET
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert len(hub) == 0
+
+async def test_import_export_round_trip(admin_client, db_session):
+    lines = [
+        '{"body": "first", "created_at": "2024-01-01T10:00:00+03:00"}',
+        "",
+        '{"body": "**second**", "pinned": true, "created_at": "2024-01-02T10:00:00"}',
+    ]
+    response = await admin_client.post("/admin/live/import", content="\n".join(lines))
+    assert response.json() == {"imported": 2}
+
+    repo = LiveEntryRepository(db_session)
+    assert await repo.count() == 2
+    pinned = (await repo.get_page()).entries[0]
+    assert "<strong>second</strong>" in pinned.body_html
+
+    response = await admin_client.get("/admin/live/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == [
+        {"body": "first", "pinned": False, "created_at": "2024-01-01T07:00:00"},
+        {"body": "**second**", "pinned": True, "created_at": "2024-01-02T10:00:00"},
+    ]
+
+async def test_import_is_all_or_nothing(admin_client, db_session):
+    body = '{"body": "ok"}\n{"pinned": true}\n'
+    response = await admin_client.post("/admin/live/import", content=body)
+    assert response.status_code == 400
+    assert "line 2" in response.text
+    assert await LiveEntryRepository(db_session).count() == 0
+
+async def test_bulk_pin_and_delete(admin_client, db_session):
+    await _seed(db_session, 4)
+    repo = LiveEntryRepository(db_session)
+
+    assert await repo.set_pinned([1, 2, 99], pinned=True) == 2
+    assert await repo.set_pinned([1, 2], pinned=True) == 0
+
+    response = await admin_client.post("/admin/live/bulk", data={"action": "delete", "ids": ["1", "3"]})
+    assert response.status_code == 303
+    assert await repo.count() == 2
+    assert [(e.id, e.pinned) for e in (await repo.get_page()).entries] == [(2, True), (4, False)]
+
+async def test_admin_endpoints_need_a_session(client, db_session):
+    await _seed(db_session, 2)
+
+    for response in [
+        await client.post("/admin/live/bulk", data={"action": "delete", "ids": ["1", "2"]}),
+        await client.post("/admin/live/import", content='{"body": "spam"}'),
+        await client.get("/admin/live/export"),
+        await client.get("/admin/"),
+    ]:
+        assert response.status_code == 303
+        assert response.headers["location"] == "/admin/login"
+    assert await LiveEntryRepository(db_session).count() == 2
+
+    # Scripts such as deploy.sh authenticate with the token header instead
+    response = await client.post("/admin/cache/invalidate", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 303
+    response = await client.post("/admin/cache/invalidate", headers={"X-Admin-Token": settings.admin_token})
+    assert response.json()["status"] == "ok"
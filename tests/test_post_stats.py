@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+from app.repositories.post_stat import PostStatRepository, hour_bucket
+
+NOW = datetime(2026, 3, 10, 15, 30)
+
+async def test_add_views_feeds_totals_and_rollups(db_session):
+    repo = PostStatRepository(db_session)
+    this_hour = NOW.replace(minute=0)
+    three_days_ago = this_hour - timedelta(days=3)
+
+    await repo.add_views({("a", this_hour): 2, ("b", this_hour): 1, ("b", three_days_ago): 5})
+    await repo.add_views({("a", this_hour): 2})
+
+    assert (await repo.get_by_slug("a")).view_count == 4
+    assert (await repo.get_by_slug("b")).view_count == 6
+
+    assert await repo.top_posts(timedelta(days=1), now=NOW) == [("a", 4), ("b", 1)]
+    assert await repo.top_posts(timedelta(days=7), now=NOW) == [("b", 6), ("a", 4)]
+    assert await repo.top_posts(timedelta(days=7), limit=1, now=NOW) == [("b", 6)]
+
+    series = await repo.view_series("b", period="day")
+    assert [views for _, views in series] == [5, 1]
+
+async def test_add_views_binds_naive_utc_for_postgres(monkeypatch):
+    from unittest.mock import AsyncMock
+    from sqlalchemy.dialects.postgresql import asyncpg, insert
+
+    db = AsyncMock()
+    repo = PostStatRepository(db)
+    monkeypatch.setattr(repo, "_insert", lambda: insert)
+    viewed_at = datetime(2026, 3, 10, 18, 30, tzinfo=timezone(timedelta(hours=3)))
+    await repo.add_views({("a", hour_bucket(viewed_at)): 1}, viewed_at=viewed_at)
+
+    moments = [
+        value
+        for call in db.execute.await_args_list
+        for value in call.args[0].compile(dialect=asyncpg.dialect()).params.values()
+        if isinstance(value, datetime)
+    ]
+    assert datetime(2026, 3, 10, 15, 30) in moments
+    # TIMESTAMP WITHOUT TIME ZONE parameters; asyncpg refuses aware datetimes
+    assert all(moment.tzinfo is None for moment in moments)
+
+async def test_dashboard_lists_top_posts(admin_client, db_session):
+    repo = PostStatRepository(db_session)
+    await repo.add_views({("popular-post", hour_bucket(datetime.now(timezone.utc))): 3})
+
+    response = await admin_client.get("/admin/")
+    assert response.status_code == 200
+    assert "Last 24h" in response.text
+    assert "popular-post" in response.text
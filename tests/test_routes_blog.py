@@ -79,23 +79,39 @@ async def test_index_shows_posts(client: AsyncClient, test_posts_dir):
     assert "A test post summary" in response.text
 
 async def test_index_tag_filter(client: AsyncClient, test_posts_dir):
-    """Tag filter shows only matching posts."""
+    """The legacy tag filter redirects to the tag listing."""
     create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
     create_test_post(test_posts_dir, "another-post.md", SAMPLE_POST_2)
     invalidate_cache()
 
     response = await client.get("/?tag=kubernetes")
+    assert response.status_code == 301
+    assert response.headers["location"] == "/tag/kubernetes"
+    assert (await client.get("/?tag=c%2B%2B&page=2")).headers["location"] == "/tag/c%2B%2B/page/2"
+
+    response = await client.get("/tag/kubernetes")
     assert response.status_code == 200
     assert "Another Post" in response.text
     assert "Test Post" not in response.text
 
 async def test_index_tag_filter_no_results(client: AsyncClient, test_posts_dir):
-    """Tag filter with no matches shows empty page without error."""
+    """An unknown tag has no listing."""
     create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
     invalidate_cache()
 
-    response = await client.get("/?tag=nonexistent")
-    assert response.status_code == 200
+    response = await client.get("/?tag=nonexistent", follow_redirects=True)
+    assert response.status_code == 404
+
+async def test_tag_links_match_listing_urls(client: AsyncClient, test_posts_dir):
+    """Tags link to their listing, and a slash cannot split a tag URL."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST.replace("  - python", "  - ci/cd\n  - c++"))
+    invalidate_cache()
+
+    page = (await client.get("/")).text
+    assert 'href="/tag/ci-cd"' in page
+    assert 'href="/tag/c%2B%2B"' in page
+    assert "Test Post" in (await client.get("/tag/ci-cd")).text
+    assert "Test Post" in (await client.get("/tag/c%2B%2B")).text
 
 # ── Post detail tests ─────────────────────────────────────
 
@@ -184,3 +200,267 @@ Test about content.
     assert response.status_code == 200
     assert "About" in response.text
     assert "whoami" in response.text
+
+# ── Page cache tests ──────────────────────────────────────
+
+async def test_post_detail_conditional_get(client: AsyncClient, test_posts_dir):
+    """Repeat readers get 304 while the view count keeps counting."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    first = await client.get("/post/test-post")
+    etag = first.headers["etag"]
+    assert "1 views" in first.text
+
+    cached = await client.get("/post/test-post", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    response = await client.get("/post/test-post")
+    assert response.headers["etag"] == etag
+    assert "3 views" in response.text
+
+async def test_index_cache_follows_content_changes(client: AsyncClient, test_posts_dir):
+    """A cached index is not served once the posts change."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+    first = await client.get("/")
+
+    create_test_post(test_posts_dir, "another-post.md", SAMPLE_POST_2)
+    invalidate_cache()
+    response = await client.get("/", headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 200
+    assert "Another Post" in response.text
+
+async def test_page_cache_keys_on_snapshot_and_used_params(client: AsyncClient, test_posts_dir):
+    """Unrelated query strings share an entry; the key follows the index snapshot."""
+    from app.http_cache import page_cache
+    from app.services.posts import get_post_index
+
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+    first = await client.get("/post/test-post")
+    tracked = await client.get("/post/test-post", params={"utm_source": "x", "n": "1"})
+    assert tracked.headers["etag"] == first.headers["etag"]
+    assert len(page_cache._entries) == 1
+
+    before = get_post_index().version
+    create_test_post(test_posts_dir, "another-post.md", SAMPLE_POST_2)
+    invalidate_cache()
+    assert get_post_index().version > before
+    assert "Another Post" in (await client.get("/")).text
+
+@pytest.mark.parametrize("stream", [False, True])
+async def test_cached_pages_have_clean_canonical_urls(client: AsyncClient, test_posts_dir,
+                                                      monkeypatch, stream):
+    """The first visitor's host and query string never end up in a cached page."""
+    from app.config import settings
+
+    monkeypatch.setattr("app.http_cache.settings.stream_templates", stream)
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+    site = settings.site_url.rstrip("/")
+
+    await client.get("/post/test-post?utm_source=spam&ref=evil", headers={"host": "evil.example"})
+    page = (await client.get("/post/test-post")).text
+    assert f'<link rel="canonical" href="{site}/post/test-post">' in page
+    assert f'<meta property="og:url" content="{site}/post/test-post">' in page
+    assert "spam" not in page and "evil" not in page
+
+    await client.get("/?utm=x")
+    page = (await client.get("/")).text
+    assert f'<link rel="canonical" href="{site}/">' in page
+    assert "utm" not in page
+
+async def test_rss_feed_is_stable_and_conditional(client: AsyncClient, test_posts_dir):
+    """Feed bytes only depend on content, so readers can revalidate."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    first = await client.get("/feed.xml")
+    assert "<lastBuildDate>Thu, 01 Jan 2026 00:00:00 +0000</lastBuildDate>" in first.text
+
+    cached = await client.get("/feed.xml", headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    # Editing an older post changes no post date, so only the ETag is trusted
+    assert "last-modified" not in first.headers
+    create_test_post(test_posts_dir, "old.md", SAMPLE_POST_2.replace(
+        "another-post", "old-post").replace("02.01.2026", "01.06.2020"))
+    invalidate_cache()
+    backdated = await client.get(
+        "/feed.xml", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+    assert backdated.status_code == 200
+    assert "old-post" in backdated.text
+
+async def test_post_detail_precompressed_gzip(client: AsyncClient, test_posts_dir):
+    """Gzip bodies are prebuilt around the view count hole and still valid."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    await client.get("/post/test-post")
+    response = await client.get("/post/test-post", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert "2 views" in response.text  # httpx decodes, so the stream is valid
+
+async def test_index_brotli_variant(client: AsyncClient, test_posts_dir):
+    """Cacheable pages without holes are also served as brotli."""
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    response = await client.get("/", headers={"Accept-Encoding": "br;q=1, gzip;q=0.5"})
+    assert response.headers["content-encoding"] == "br"
+    assert "Test Post" in response.text
+
+    identity = await client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+async def test_post_views_flush_in_batches(client: AsyncClient, db_session, test_posts_dir):
+    """Buffered views land in post_stats with one upsert per flush."""
+    from app.repositories.post_stat import PostStatRepository
+    from app.services.view_counter import view_counter
+
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    await client.get("/post/test-post")
+    await client.get("/post/test-post")
+    assert await view_counter.flush(db_session) == 2
+
+    await client.get("/post/test-post")
+    assert await view_counter.flush(db_session) == 1
+
+    stat = await PostStatRepository(db_session).get_by_slug("test-post")
+    assert stat.view_count == 3
+    response = await client.get("/post/test-post")
+    assert "4 views" in response.text
+
+async def test_streamed_render_fills_the_cache(client: AsyncClient, test_posts_dir, monkeypatch):
+    """A streamed miss matches the buffered page and is cached for the next hit."""
+    from app.http_cache import _chunks
+
+    monkeypatch.setattr("app.http_cache.settings.stream_templates", True)
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    invalidate_cache()
+
+    streamed = await client.get("/post/test-post")
+    assert streamed.status_code == 200
+    assert "etag" not in streamed.headers
+    assert "1 views" in streamed.text
+
+    cached = await client.get("/post/test-post")
+    assert cached.headers["etag"]
+    assert cached.text == streamed.text.replace("1 views", "2 views")
+
+    # The head goes out on its own, ahead of the body
+    chunks = list(_chunks(iter(["<html><head>", "<link>", "</head><body>", "x", "</body>"])))
+    assert chunks == ["<html><head><link></head><body>", "x</body>"]
+
+async def test_katex_only_on_posts_with_math(client: AsyncClient, test_posts_dir):
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    create_test_post(test_posts_dir, "math.md", SAMPLE_POST_2.replace(
+        "## Another post content", "Energy: $$E = mc^2$$"
+    ))
+    invalidate_cache()
+
+    plain = await client.get("/post/test-post")
+    assert "katex" not in plain.text
+    math = await client.get("/post/another-post")
+    assert "katex.min.js" in math.text
+
+async def test_css_bundle(client: AsyncClient, monkeypatch):
+    from app.services.assets import css_bundle, minify_css
+
+    monkeypatch.setattr("app.services.assets.settings.app_env", "production")
+    bundle = css_bundle()
+    page = await client.get("/missing")
+    assert f'href="/assets/{bundle.name}"' in page.text
+    assert "/static/css/main.css" not in page.text
+
+    response = await client.get(f"/assets/{bundle.name}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/css")
+    assert "immutable" in response.headers["cache-control"]
+    assert response.content == bundle.body
+    assert (await client.get("/assets/bundle.000000000000.css")).status_code == 404
+
+    css = "a , b {\n  color: red; /* note */\n  content: 'a  ;  b';\n}"
+    assert minify_css(css) == "a,b{color:red;content:'a  ;  b'}"
+
+async def test_responsive_images(client: AsyncClient, test_posts_dir, tmp_path, monkeypatch):
+    import io
+    from PIL import Image
+    from watchfiles import Change
+    from app.services import posts
+    from app.services.watcher import _apply
+
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    Image.new("RGB", (1200, 800), "teal").save(images_dir / "wide.jpg")
+    monkeypatch.setattr("app.services.images.IMAGES_DIR", str(images_dir))
+    monkeypatch.setattr("app.services.images.settings.image_cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr("app.services.images._info", {})
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST + "\n![wide](../images/wide.jpg)\n")
+    invalidate_cache()
+
+    page = (await client.get("/post/test-post")).text
+    assert 'srcset="/img/480/wide.jpg.webp 480w, /img/960/wide.jpg.webp 960w, /img/1200/wide.jpg.webp 1200w"' in page
+    assert 'srcset="/img/480/wide.jpg 480w, /img/960/wide.jpg 960w, /images/wide.jpg 1200w"' in page
+    assert 'width="1200" height="800" loading="lazy"' in page
+
+    response = await client.get("/img/480/wide.jpg.webp")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert Image.open(images_dir.parent / "cache" / "480" / "wide.jpg.webp").size == (480, 320)
+    assert (await client.get("/img/480/wide.jpg")).headers["content-type"] == "image/jpeg"
+
+    # Other widths get the next advertised size, never a new one
+    response = await client.get("/img/500/wide.jpg")
+    assert Image.open(io.BytesIO(response.content)).size == (960, 640)
+    response = await client.get("/img/2000/wide.jpg")
+    assert Image.open(io.BytesIO(response.content)).size == (1200, 800)
+    assert sorted(os.listdir(tmp_path / "cache")) == ["480", "960"]
+    assert (await client.get("/img/480/missing.jpg")).status_code == 404
+
+    # A narrower replacement is picked up by the watcher, and srcsets
+    # rendered for the old image still resolve
+    Image.new("RGB", (800, 400), "teal").save(images_dir / "wide.jpg")
+    _apply({(Change.modified, str(images_dir / "wide.jpg"))})
+    posts._schedule_reload().result()
+    page = (await client.get("/post/test-post")).text
+    assert 'srcset="/img/480/wide.jpg 480w, /images/wide.jpg 800w"' in page
+    assert 'width="800" height="400" loading="lazy"' in page
+    response = await client.get("/img/1200/wide.jpg.webp")
+    assert Image.open(io.BytesIO(response.content)).size == (800, 400)
+
+async def test_index_and_tag_pagination(client: AsyncClient, test_posts_dir, monkeypatch):
+    monkeypatch.setattr("app.services.posts.PAGE_SIZE", 1)
+    create_test_post(test_posts_dir, "test-post.md", SAMPLE_POST)
+    create_test_post(test_posts_dir, "another-post.md", SAMPLE_POST_2)
+    create_test_post(test_posts_dir, "third.md", SAMPLE_POST_2.replace(
+        "another-post", "third-post").replace("Another Post", "Third Post").replace("02.01", "03.01"))
+    invalidate_cache()
+
+    first = await client.get("/")
+    assert "Third Post" in first.text and "Another Post" not in first.text
+    assert 'href="/?page=2" rel="next"' in first.text
+    second = await client.get("/?page=2")
+    assert "Another Post" in second.text
+    assert 'href="/" rel="prev"' in second.text and 'href="/?page=3"' in second.text
+    assert (await client.get("/?page=4")).status_code == 404
+
+    tag = await client.get("/tag/kubernetes")
+    assert "Third Post" in tag.text and 'href="/tag/kubernetes/page/2"' in tag.text
+    assert "Another Post" in (await client.get("/tag/kubernetes/page/2")).text
+    assert (await client.get("/tag/kubernetes/page/3")).status_code == 404
+    assert (await client.get("/tag/missing")).status_code == 404
+    redirect = await client.get("/tag/kubernetes/page/1")
+    assert redirect.status_code == 301 and redirect.headers["location"] == "/tag/kubernetes"
+
+    sitemap = (await client.get("/sitemap.xml")).text
+    for path in ("/?page=3", "/tag/devops", "/tag/kubernetes/page/2"):
+        assert f"{path}</loc>" in sitemap
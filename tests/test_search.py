@@ -0,0 +1,114 @@
+from datetime import date
+import pytest
+from httpx import AsyncClient
+from app.repositories.live_entry import LiveEntryRepository
+from app.services.posts import Post, PostIndex, get_post_index, invalidate_cache
+
+def make_post(slug: str, title: str, body: str, tags=(), day: int = 1) -> Post:
+    return Post(
+        title=title,
+        date=date(2026, 1, day),
+        slug=slug,
+        summary=f"About {title}",
+        content_html=f"<p>{body}</p>",
+        tags=list(tags),
+    )
+
+# ── Post index ───────────────────────────────────────────
+
+def test_post_search_ranks_and_highlights():
+    index = PostIndex.build([
+        make_post("nginx", "Tuning nginx", "Workers &amp; buffers for nginx.", tags=["nginx"]),
+        make_post("k8s", "Kubernetes ingress", "Ingress controllers often run nginx.", day=2),
+        make_post("bash", "Bash tricks", "Nothing to see here.", day=3),
+    ])
+
+    hits = index.search.search("NGINX")
+    assert [hit.post.slug for hit in hits] == ["nginx", "k8s"]
+    assert "<mark>nginx</mark>" in hits[0].snippet
+    assert "&amp;" in hits[0].snippet
+
+    # Every term has to match
+    assert [hit.post.slug for hit in index.search.search("nginx ingress")] == ["k8s"]
+    assert index.search.search("nginx missing") == []
+    assert index.search.search("  ") == []
+
+def test_post_search_markup_is_escaped():
+    index = PostIndex.build([make_post("x", "X", "use &lt;script&gt; tags amp")])
+    snippet = index.search.search("script amp")[0].snippet
+    assert "<script>" not in snippet
+    assert "&lt;<mark>script</mark>&gt;" in snippet
+
+@pytest.fixture
+def posts_dir(monkeypatch, tmp_path):
+    directory = tmp_path / "posts"
+    directory.mkdir()
+    monkeypatch.setattr("app.services.posts.POSTS_DIR", str(directory))
+    invalidate_cache()
+    yield directory
+    invalidate_cache()
+
+POST = """---
+title: {title}
+date: 01.01.2026
+slug: {slug}
+summary: Summary
+---
+
+{body}
+"""
+
+def test_search_documents_survive_reload(posts_dir):
+    (posts_dir / "a.md").write_text(POST.format(slug="a", title="Alpha", body="terraform state"))
+    (posts_dir / "b.md").write_text(POST.format(slug="b", title="Beta", body="ansible roles"))
+    first = get_post_index()
+    document = first.search.documents[first.posts.index(first.by_slug["a"])]
+
+    (posts_dir / "b.md").write_text(POST.format(slug="b", title="Beta", body="terraform modules"))
+    invalidate_cache()
+    second = get_post_index()
+
+    # The unchanged post keeps its document; the changed one is re-indexed
+    assert any(d is document for d in second.search.documents)
+    assert {hit.post.slug for hit in second.search.search("terraform")} == {"a", "b"}
+
+# ── Live entries ─────────────────────────────────────────
+
+async def test_live_search_follows_writes(db_session):
+    repo = LiveEntryRepository(db_session)
+    kept = await repo.create("Rolling out <b>Postgres</b> 17 today")
+    gone = await repo.create("Postgres upgrade rolled back")
+    await repo.create("Coffee break")
+
+    hits = await repo.search("postgres")
+    assert {hit.id for hit in hits} == {kept.id, gone.id}
+    snippet = next(hit.snippet for hit in hits if hit.id == kept.id)
+    assert "&lt;b&gt;<mark>Postgres</mark>&lt;/b&gt;" in snippet
+
+    await repo.delete(gone.id)
+    assert [hit.id for hit in await repo.search("postgres")] == [kept.id]
+    # FTS5 syntax in user input is matched literally, not parsed
+    assert await repo.search('postgres" OR coffee') == []
+
+async def test_live_search_without_full_text_index(db_session):
+    repo = LiveEntryRepository(db_session)
+    await repo.create("Rolling out <b>Postgres</b> 17 today")
+    await repo.create("Postgres upgrade rolled back")
+    await repo.create("100% of disk_used")
+
+    hits = await repo._search_like(["postgres", "rolled"], limit=20)
+    assert [hit.id for hit in hits] == [2]
+    assert "<mark>Postgres</mark> upgrade <mark>rolled</mark> back" == hits[0].snippet
+    # LIKE wildcards in the query are literal
+    assert [hit.id for hit in await repo._search_like(["disk_used"], limit=20)] == [3]
+    assert await repo._search_like(["disk_u"], limit=20) != []
+    assert await repo._search_like(["d_sk"], limit=20) == []
+
+async def test_search_page(client: AsyncClient, posts_dir, db_session):
+    (posts_dir / "a.md").write_text(POST.format(slug="a", title="Alpha", body="grafana dashboards"))
+    await LiveEntryRepository(db_session).create("new grafana panel")
+
+    response = await client.get("/search", params={"q": "grafana"})
+    assert response.status_code == 200
+    assert 'href="/post/a"' in response.text
+    assert "new <mark>grafana</mark> panel" in response.text
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import pytest
+from app.services import posts
+from app.services.posts import invalidate_cache, get_all_posts
+
+POST_TEMPLATE = """---
+title: {title}
+date: 01.01.2026
+slug: {slug}
+summary: Summary
+tags:
+  - devops
+---
+
+Body of {title}.
+"""
+
+# ── Fixtures ─────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def posts_dir(monkeypatch, tmp_path):
+    directory = tmp_path / "posts"
+    directory.mkdir()
+    monkeypatch.setattr("app.services.posts.POSTS_DIR", str(directory))
+    invalidate_cache()
+    yield directory
+    invalidate_cache()
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Count how many times post markdown is actually parsed."""
+    calls = []
+    original = posts._parse_post_text
+
+    def counting(raw, *args):
+        calls.append(raw)
+        return original(raw, *args)
+
+    monkeypatch.setattr("app.services.posts._parse_post_text", counting)
+    return calls
+
+def write_post(directory, slug, title):
+    path = directory / f"{slug}.md"
+    path.write_text(POST_TEMPLATE.format(slug=slug, title=title))
+    return path
+
+# ── Incremental reload ───────────────────────────────────
+
+def test_reload_skips_unchanged_files(posts_dir, parse_calls):
+    write_post(posts_dir, "one", "One")
+    write_post(posts_dir, "two", "Two")
+    assert len(get_all_posts()) == 2
+    assert len(parse_calls) == 2
+
+    invalidate_cache()
+    assert len(get_all_posts()) == 2
+    assert len(parse_calls) == 2
+
+def test_reload_parses_changed_and_drops_removed(posts_dir, parse_calls):
+    one = write_post(posts_dir, "one", "One")
+    two = write_post(posts_dir, "two", "Two")
+    get_all_posts()
+
+    one.write_text(POST_TEMPLATE.format(slug="one", title="One, edited"))
+    os.remove(two)
+    invalidate_cache()
+
+    titles = [p.title for p in get_all_posts()]
+    assert titles == ["One, edited"]
+    assert len(parse_calls) == 3
+
+def test_reload_reuses_post_when_only_touched(posts_dir, parse_calls):
+    one = write_post(posts_dir, "one", "One")
+    first = get_all_posts()[0]
+
+    stat = one.stat()
+    os.utime(one, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    invalidate_cache()
+
+    assert get_all_posts()[0] is first
+    assert len(parse_calls) == 1
+
+# ── Post index ───────────────────────────────────────────
+
+def test_index_lookups(posts_dir):
+    write_post(posts_dir, "one", "One")
+    write_post(posts_dir, "two", "Two")
+    index = posts.get_post_index()
+
+    assert index.by_slug["two"].title == "Two"
+    assert [p.slug for p in index.by_tag["devops"]] == [p.slug for p in index.posts]
+    assert index.tags == ("devops",)
+    assert posts.get_post_by_slug("missing") is None
+
+def test_index_is_swapped_on_reload(posts_dir):
+    write_post(posts_dir, "one", "One")
+    before = posts.get_post_index()
+
+    write_post(posts_dir, "two", "Two")
+    invalidate_cache()
+    after = posts.get_post_index()
+
+    assert len(before.posts) == 1
+    assert len(after.posts) == 2
+
+# ── Background reload ────────────────────────────────────
+
+async def test_expired_index_is_served_while_reloading(posts_dir, monkeypatch):
+    write_post(posts_dir, "one", "One")
+    stale = await posts.get_post_index_async()
+
+    write_post(posts_dir, "two", "Two")
+    monkeypatch.setattr("app.services.posts._CACHE_TTL", 0)
+
+    assert await posts.get_post_index_async() is stale
+    posts._schedule_reload().result()
+    monkeypatch.setattr("app.services.posts._CACHE_TTL", 3600)
+    assert len((await posts.get_post_index_async()).posts) == 2
+
+async def test_concurrent_callers_share_one_reload(posts_dir, parse_calls):
+    write_post(posts_dir, "one", "One")
+
+    results = await asyncio.gather(*(posts.get_post_index_async() for _ in range(10)))
+
+    assert all(index is results[0] for index in results)
+    assert len(parse_calls) == 1
+
+# ── Persistent render cache ──────────────────────────────
+
+def test_render_cache_survives_restart(posts_dir, monkeypatch):
+    write_post(posts_dir, "one", "One")
+    first = get_all_posts()[0]
+
+    renders = []
+    original = posts.render_post
+    monkeypatch.setattr(
+        "app.services.posts.render_post",
+        lambda raw: renders.append(raw) or original(raw),
+    )
+    # Simulate a fresh process: nothing parsed in memory yet
+    monkeypatch.setattr("app.services.posts._sources", {})
+    invalidate_cache()
+
+    post = get_all_posts()[0]
+    assert renders == []
+    assert post.content_html == first.content_html
+    assert post.date == first.date
+
+# ── Filesystem watcher ───────────────────────────────────
+
+async def test_watcher_reloads_changed_posts(posts_dir, monkeypatch, tmp_path):
+    from app.services.watcher import watch_content
+
+    pages_dir = tmp_path / "pages"
+    pages_dir.mkdir()
+    monkeypatch.setattr("app.services.pages.PAGES_DIR", str(pages_dir))
+    monkeypatch.setattr("app.services.posts._CACHE_TTL", 0)
+
+    write_post(posts_dir, "one", "One")
+    await posts.get_post_index_async()
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(watch_content(stop))
+    try:
+        await asyncio.sleep(0.3)
+        write_post(posts_dir, "two", "Two")
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            if len((await posts.get_post_index_async()).posts) == 2:
+                break
+        assert len((await posts.get_post_index_async()).posts) == 2
+    finally:
+        stop.set()
+        await task
+
+# ── Cross-worker generation ──────────────────────────────
+
+async def test_generation_bump_drops_index(posts_dir):
+    from app.services import generation
+
+    write_post(posts_dir, "one", "One")
+    await posts.get_post_index_async()
+
+    write_post(posts_dir, "two", "Two")
+    generation.bump()  # as done by another worker's /admin/cache/invalidate
+
+    assert len((await posts.get_post_index_async()).posts) == 2
+
+# ── Highlighting cache ───────────────────────────────────
+
+def test_code_blocks_are_highlighted_once(posts_dir):
+    from app.services.live import render_body
+    from app.services.markdown import highlight_cache
+
+    highlight_cache.clear()
+    snippet = "```yaml\nreplicas: 3\n```\n"
+    (posts_dir / "a.md").write_text(POST_TEMPLATE.format(slug="a", title="A") + snippet)
+    post = posts.get_post_by_slug("a")
+
+    # Same block from a live entry, with the same formatter options
+    assert 'class="highlight"' in render_body(snippet)
+    assert render_body(snippet) in post.content_html
+    assert highlight_cache.stats() == {"entries": 1, "hits": 2, "misses": 1}
+
+# ── Related posts ────────────────────────────────────────
+
+def test_related_posts_skip_unrelated_and_series():
+    from datetime import date
+    from app.services.posts import Post, PostIndex
+
+    def post(slug, body, tags=(), series=None, day=1):
+        return Post(title=slug, date=date(2026, 1, day), slug=slug, summary="",
+                    content_html=f"<p>{body}</p>", tags=list(tags), series=series)
+
+    index = PostIndex.build([
+        post("ingress", "nginx ingress controller annotations", ["k8s"], day=1),
+        post("probes", "liveness probes restart pods", ["k8s"], series="k8s", day=2),
+        post("limits", "pod limits and requests restart pods", ["k8s"], series="k8s", day=3),
+        post("tuning", "nginx worker tuning and buffers", ["nginx"], day=4),
+        post("bash", "shell loops and traps", ["bash"], day=5),
+    ])
+
+    assert index.related["tuning"][0].slug == "ingress"
+    assert index.related["ingress"][0].slug == "tuning"
+    # Series siblings are linked already, unrelated posts are left out
+    assert "limits" not in [p.slug for p in index.related["probes"]]
+    assert index.related["bash"] == ()
+
+def test_related_vocabulary_is_compacted():
+    from app.services import related
+    from app.services.search import SearchDocument
+
+    def doc(words):
+        return SearchDocument(text=words, terms={w: 1 for w in words.split()}, length=1)
+
+    kept = doc("nginx ingress")
+    for n in range(20):
+        related._tfidf((kept, doc(f"nginx draft{n} words{n}")))
+    # 4 live terms: nginx, ingress, draft19, words19
+    assert len(related._term_ids) <= 8
+
+    # Vectors kept across the renumbering still point at their own terms
+    ids = {i: term for term, i in related._term_ids.items()}
+    assert sorted(ids[i] for i in related._vectors[id(kept)][1]) == ["ingress", "nginx"]
@@ -0,0 +1,26 @@
+import os
+from app.templates import make_environment, precompile
+
+def test_production_templates_share_bytecode(tmp_path):
+    bytecode_dir = tmp_path / "bytecode"
+    env = make_environment(production=True, bytecode_dir=str(bytecode_dir))
+    assert env.auto_reload is False
+    # Nothing is created until a template is compiled
+    assert not bytecode_dir.exists()
+
+    compiled = precompile(env)
+    assert compiled >= len(["base.html", "index.html", "post.html"])
+    assert len(os.listdir(bytecode_dir)) == compiled
+
+    # A fresh worker loads bytecode instead of compiling the sources
+    fresh = make_environment(production=True, bytecode_dir=str(bytecode_dir))
+    calls = []
+    compile_source = fresh.compile
+    fresh.compile = lambda *args, **kwargs: calls.append(args) or compile_source(*args, **kwargs)
+    assert precompile(fresh) == compiled
+    assert calls == []
+
+def test_development_templates_reload():
+    env = make_environment(production=False, bytecode_dir="unused")
+    assert env.auto_reload is True
+    assert env.bytecode_cache is None